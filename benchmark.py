@@ -0,0 +1,578 @@
+"""Benchmark und Paritätsprüfung für die Trade-Auswertung aus Google Sheets, Equity-Curve-Downsampling,
+Größenbudget der Chart-Bilder und die komplette Dashboard-Pipeline gegen lokale Stand-ins (ohne Netzwerkzugriff)"""
+import argparse
+import functools
+import json
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from gspread.utils import numericise_all
+
+import web_dashboard as dashboard
+
+BYBIT_HEADERS = ['Contracts', 'Trade Type', 'Qty', 'Entry Price', 'Filled Price', 'Realized P&L', 'Filled/Settlement Time(UTC+0)', 'Fee']
+BLOFIN_HEADERS = ['Underlying Asset', 'Side', 'Filled', 'Avg Fill', 'Filled Price', 'PNL', 'Fee', 'Order Time']
+
+# Maximale Dateigröße je Chart-Variante (Bytes pro Breite und Format)
+CHART_BYTE_BUDGET = {
+    ('png', 480): 40_000,
+    ('png', 960): 100_000,
+    ('png', 1600): 200_000,
+    ('webp', 480): 12_000,
+    ('webp', 960): 25_000,
+    ('webp', 1600): 50_000
+}
+
+def synthetic_row(headers, rng):
+    """Eine Zeile wie sie values_batch_get liefert (Strings, teils formatiert, teils leer)"""
+    pnl = rng.uniform(-80, 100)
+    values = {
+        'Contracts': rng.choice(['BTCUSDT', 'ETHUSDT', '1000PEPEUSDT', 'SOLUSDT', '']),
+        'Underlying Asset': rng.choice(['BTC-USDT', 'AVAX-USDT', 'SOL-PERP', '']),
+        'Trade Type': rng.choice(['Buy', 'Sell', 'Open Long', 'Close Short']),
+        'Side': rng.choice(['Open Long', 'Close Short', 'Buy', 'Sell']),
+        'Qty': f"{rng.uniform(0.01, 50):.3f}",
+        'Filled': f"{rng.randint(1, 500)} AVAX",
+        'Entry Price': f"{rng.uniform(0.1, 70000):,.4f}",
+        'Avg Fill': f"{rng.uniform(0.1, 70000):.4f} USDT",
+        'Filled Price': f"{rng.uniform(0.1, 70000):.4f}",
+        'Realized P&L': rng.choice([f"{pnl:.4f}", f"${pnl:,.2f}", '0', '']),
+        'PNL': rng.choice([f"{pnl:.4f} USDT", '--', '']),
+        'Fee': f"{rng.uniform(0.01, 2):.4f} USDT",
+        'Filled/Settlement Time(UTC+0)': f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 10:00:00",
+        'Order Time': f"05/{rng.randint(1, 28):02d}/2025 10:00:00"
+    }
+    row = [values[header] for header in headers]
+    # Wie die Sheets API: leere Zellen am Zeilenende fehlen
+    while row and row[-1] == '':
+        row.pop()
+    return row
+
+def synthetic_sheets(rows_per_sheet, seed):
+    rng = random.Random(seed)
+    sheets = {}
+    for sheet_name in dashboard.sheet_mapping:
+        headers = BLOFIN_HEADERS if sheet_name == "Blofin-7-Tage" else BYBIT_HEADERS
+        sheets[sheet_name] = [headers] + [synthetic_row(headers, rng) for _ in range(rows_per_sheet)]
+    return sheets
+
+def row_by_row(sheet_name, values):
+    """Referenz: zeilenweiser Parser mit skalarer Statistik"""
+    state = dashboard.new_trade_state(values)
+    trades = dashboard.parse_trade_rows(sheet_name, dashboard.sheet_mapping[sheet_name], values[0], values[1:])
+    dashboard.add_trades_to_state(state, trades)
+    return dashboard.account_details_from_state(dashboard.sheet_mapping[sheet_name], state)
+
+def columnar(sheet_name, values):
+    dashboard.full_scan_trade_sheet(sheet_name, values)
+    return dashboard.account_details_from_state(dashboard.sheet_mapping[sheet_name], dashboard.trade_store[sheet_name])
+
+def comparable(details):
+    # 0 und 0.0 gelten als gleich (Default-Werte sind im Zeilen-Parser int)
+    def normalize(trade):
+        return {k: (float(v) if isinstance(v, (int, float)) else v) for k, v in trade.items()}
+    details = dict(details)
+    details['all_trades'] = [normalize(t) for t in details['all_trades']]
+    details['recent_trades'] = [normalize(t) for t in details['recent_trades']]
+    return details
+
+def synthetic_equity(rng, days):
+    """Tägliche PnL-Reihe (Random Walk mit leichtem Aufwärtstrend) und Datumsangaben wie in DailyBalances"""
+    pnl_values = [0.0]
+    for _ in range(days - 1):
+        pnl_values.append(pnl_values[-1] + rng.gauss(5, 60))
+    start = dashboard.datetime(2025, 1, 1)
+    dates = [(start + dashboard.timedelta(days=day)).strftime('%d.%m.%Y') for day in range(days)]
+    return pnl_values, dates
+
+def synthetic_charts(seed, days=365):
+    """Render-Funktionen aller Charts mit zufälligen Account-Daten und einer Equity Curve über `days` Tage"""
+    rng = random.Random(seed)
+    account_data = []
+    for acc in dashboard.subaccounts:
+        start = dashboard.startkapital.get(acc['name'], 1000)
+        pnl = start * rng.uniform(-0.6, 1.5)
+        account_data.append({'name': acc['name'], 'balance': start + pnl, 'pnl': pnl, 'pnl_percent': pnl / start * 100})
+    
+    equity_spec = dashboard.equity_curve_series(*synthetic_equity(rng, days), dashboard.EQUITY_CURVE_MAX_POINTS)
+    
+    charts = {
+        'equity_curve_small': lambda path: dashboard.render_equity_curve(path, equity_spec),
+        'chart_strategien': lambda path: dashboard.render_performance_chart(path, dashboard.strategy_chart_data(account_data)),
+        'chart_projekte': lambda path: dashboard.render_performance_chart(path, dashboard.project_chart_data(account_data))
+    }
+    for name, options in dashboard.PLACEHOLDER_CHARTS.items():
+        charts[f"placeholder_{name}"] = lambda path, options=options: dashboard.render_placeholder_chart(path, **options)
+    return charts
+
+def check_chart_budget(seed):
+    """Rendert alle Charts in ein temporäres Verzeichnis und prüft jede Variante gegen CHART_BYTE_BUDGET"""
+    over_budget = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, render in synthetic_charts(seed).items():
+            chart_path = os.path.join(tmp_dir, f"{name}.png")
+            start = time.perf_counter()
+            render(chart_path)
+            render_time = time.perf_counter() - start
+            
+            sizes = []
+            for width in dashboard.CHART_WIDTHS:
+                for fmt in dashboard.CHART_FORMATS:
+                    size = os.path.getsize(dashboard.chart_variant_path(chart_path, width, fmt))
+                    if size > CHART_BYTE_BUDGET[(fmt, width)]:
+                        over_budget.append(f"{name} {width}w.{fmt} ({size} > {CHART_BYTE_BUDGET[(fmt, width)]} Bytes)")
+                    sizes.append(f"{width}w.{fmt} {size / 1024:6.1f}k")
+            print(f"{name:<32} {render_time:6.2f}s  {'  '.join(sizes)}")
+    return over_budget
+
+def curve_features(spec):
+    """Was im Chart sichtbar ist: Start, Ende, ATH, Tiefpunkt und größter Drawdown (mit Tag)"""
+    days, values, peaks = spec['days'], spec['pnl_values'], spec['peaks']
+    drawdowns = [value - peak for value, peak in zip(values, peaks)]
+    trough = drawdowns.index(min(drawdowns))
+    return {
+        'start': (days[0], values[0]),
+        'end': (days[-1], values[-1]),
+        'ath': (days[values.index(max(values))], max(values)),
+        'low': (days[values.index(min(values))], min(values)),
+        'max_drawdown': (days[trough], drawdowns[trough]),
+        'final_peak': peaks[-1]
+    }
+
+def benchmark_equity_curve(years, seed):
+    """Vergleicht Render-Zeit und JSON-Größe der Equity Curve über `years` Jahre mit und ohne Downsampling"""
+    pnl_values, dates = synthetic_equity(random.Random(seed), years * 365)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for label, max_points in (('alle Tage', 0), (f"Budget {dashboard.EQUITY_CURVE_MAX_POINTS}", dashboard.EQUITY_CURVE_MAX_POINTS)):
+            start = time.perf_counter()
+            spec = dashboard.equity_curve_series(pnl_values, dates, max_points)
+            series_time = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            dashboard.render_equity_curve(os.path.join(tmp_dir, 'equity_curve_small.png'), spec)
+            render_time = time.perf_counter() - start
+            
+            results[label] = curve_features(spec)
+            print(f"{label:<14} {len(spec['days']):>6} Punkte  Reihe {series_time * 1000:7.1f}ms  Render {render_time:6.2f}s  JSON {len(json.dumps(spec)) / 1024:7.1f}k")
+    
+    full, sampled = results.values()
+    if full != sampled:
+        raise SystemExit(f"Downsampling verändert die Kurve: {full} != {sampled}")
+    print(f"Start, Ende, ATH, Tiefpunkt und größter Drawdown identisch ({years} Jahre, {len(pnl_values)} Tage)")
+
+# Pipeline-Benchmark: Exchange- und Sheets-Clients werden durch Stand-ins mit künstlicher Latenz ersetzt
+PIPELINE_ROWS = 2000
+REGRESSION_TOLERANCE = 0.25
+REGRESSION_FLOOR = 0.005  # Sekunden; kleinere Abweichungen gelten als Rauschen
+CLOSED_PNL_INTERVAL_MS = 90 * 60 * 1000  # ein synthetischer Trade alle 90 Minuten je Account
+
+class Latency:
+    def __init__(self, mean_ms, jitter_ms, seed):
+        self.mean_ms = mean_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+    
+    def sleep(self):
+        time.sleep(max(0.0, self._rng.gauss(self.mean_ms, self.jitter_ms)) / 1000)
+
+class FakeBybitHTTP:
+    """Stand-in für pybit.unified_trading.HTTP (nur die Aufrufe aus BybitAdapter)"""
+    
+    def __init__(self, fixtures, latency, api_key=None, api_secret=None, **kwargs):
+        self.fixtures = fixtures
+        self.latency = latency
+        self.seed = sum(map(ord, api_key or ''))
+    
+    def get_wallet_balance(self, accountType):
+        self.latency.sleep()
+        if 'bybit_wallet' in self.fixtures:
+            return self.fixtures['bybit_wallet']
+        balance = 1000 + random.Random(self.seed).uniform(-300, 900)
+        return {'retCode': 0, 'result': {'list': [{'coin': [{'coin': 'USDT', 'walletBalance': f"{balance:.4f}"}]}]}}
+    
+    def get_positions(self, category, settleCoin):
+        self.latency.sleep()
+        if 'bybit_positions' in self.fixtures:
+            return self.fixtures['bybit_positions']
+        rng = random.Random(self.seed)
+        positions = [{
+            'symbol': rng.choice(['BTCUSDT', 'ETHUSDT', 'SOLUSDT']),
+            'side': rng.choice(['Buy', 'Sell']),
+            'size': f"{rng.uniform(0.01, 5):.3f}",
+            'avgPrice': f"{rng.uniform(10, 60000):.2f}",
+            'markPrice': f"{rng.uniform(10, 60000):.2f}",
+            'unrealisedPnl': f"{rng.uniform(-50, 80):.4f}"
+        } for _ in range(rng.randint(0, 4))]
+        return {'retCode': 0, 'result': {'list': positions}}
+    
+    def get_closed_pnl(self, category, limit, startTime, endTime, cursor=None):
+        """Neueste zuerst und per Cursor (Offset) geblättert wie bei Bybit"""
+        self.latency.sleep()
+        first = -(-startTime // CLOSED_PNL_INTERVAL_MS) * CLOSED_PNL_INTERVAL_MS
+        times = list(range(first, endTime + 1, CLOSED_PNL_INTERVAL_MS))[::-1]
+        offset = int(cursor or 0)
+        entries = []
+        for updated_time in times[offset:offset + limit]:
+            rng = random.Random(self.seed * 1_000_003 + updated_time)
+            price = rng.uniform(10, 60000)
+            entries.append({
+                'orderId': f"{self.seed}-{updated_time}",
+                'symbol': rng.choice(['BTCUSDT', 'ETHUSDT', '1000PEPEUSDT', 'SOLUSDT']),
+                'side': rng.choice(['Buy', 'Sell']),
+                'qty': f"{rng.uniform(0.01, 5):.3f}",
+                'avgEntryPrice': f"{price:.2f}",
+                'avgExitPrice': f"{price * rng.uniform(0.97, 1.03):.2f}",
+                'closedPnl': f"{rng.uniform(-80, 100):.4f}",
+                'createdTime': str(updated_time - 60_000),
+                'updatedTime': str(updated_time)
+            })
+        next_cursor = str(offset + limit) if offset + limit < len(times) else ''
+        return {'retCode': 0, 'result': {'list': entries, 'nextPageCursor': next_cursor}}
+
+class FakeBlofinAPI:
+    """Stand-in für BlofinAPI mit den Antwortformaten aus BlofinAdapter"""
+    
+    def __init__(self, fixtures, latency, api_key, api_secret, passphrase):
+        self.fixtures = fixtures
+        self.latency = latency
+    
+    def get_account_balance(self):
+        self.latency.sleep()
+        return self.fixtures.get('blofin_balance', {'code': '0', 'data': [{'currency': 'USDT', 'totalEq': '1587.25'}]})
+    
+    def get_positions(self):
+        self.latency.sleep()
+        return self.fixtures.get('blofin_positions', {'code': '0', 'data': [
+            {'instId': 'AVAX-USDT', 'positions': '12', 'positionSide': 'short', 'averagePrice': '21.4', 'markPrice': '20.9', 'unrealizedPnl': '6.1'}
+        ]})
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title):
+        self.spreadsheet = spreadsheet
+        self.title = title
+    
+    def get_all_records(self):
+        self.spreadsheet.latency.sleep()
+        self.spreadsheet.reads['get_all_records'] += 1
+        values = self.spreadsheet.sheets[self.title]
+        headers = values[0]
+        return [dict(zip(headers, numericise_all(row + [''] * (len(headers) - len(row))))) for row in values[1:]]
+    
+    def append_row(self, row):
+        self.spreadsheet.latency.sleep()
+        values = self.spreadsheet.sheets[self.title]
+        values.append([str(value) for value in row])
+        return {'updates': {'updatedRange': f"{dashboard.sheet_range(self.title)}!A{len(values)}:C{len(values)}"}}
+    
+    def acell(self, label):
+        self.spreadsheet.latency.sleep()
+        row = int(label.lstrip('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+        values = self.spreadsheet.sheets[self.title]
+        return SimpleNamespace(value=values[row - 1][0] if row <= len(values) and values[row - 1] else None)
+    
+    def update(self, values, range_name):
+        self.spreadsheet.latency.sleep()
+        row = int(range_name.split(':')[0].lstrip('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+        self.spreadsheet.sheets[self.title][row - 1][1:1 + len(values[0])] = [str(value) for value in values[0]]
+
+class FakeSpreadsheet:
+    """Stand-in für gspread.Spreadsheet: worksheets() und values_batch_get() auf Werten im Speicher"""
+    id = 'benchmark'
+    
+    def __init__(self, sheets, latency):
+        self.sheets = sheets
+        self.latency = latency
+        self.reads = Counter()
+    
+    def worksheets(self):
+        self.latency.sleep()
+        return [FakeWorksheet(self, title) for title in self.sheets]
+    
+    def select_range(self, a1_range):
+        # 'Name', 'Name'!1:1 oder 'Name'!A17:H wie von sync_trade_sheets angefragt
+        sheet_part, _, cells = a1_range.rpartition('!') if '!' in a1_range else (a1_range, '', '')
+        values = self.sheets[sheet_part[1:-1].replace("''", "'")]
+        if not cells:
+            return values
+        start, _, end = cells.partition(':')
+        first_row = int(start.lstrip('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+        last_row = int(end) if start.isdigit() else len(values)
+        return values[first_row - 1:last_row]
+    
+    def values_batch_get(self, ranges):
+        self.latency.sleep()
+        self.reads['values_batch_get'] += 1
+        return {'valueRanges': [{'range': a1_range, 'values': self.select_range(a1_range)} for a1_range in ranges]}
+
+class FakeCredentials:
+    valid = True
+
+def synthetic_daily_balances(rng, days):
+    today = datetime.now(dashboard.timezone("Europe/Berlin")).date()
+    values = [['Datum', 'Balance', 'PnL']]
+    pnl = 0.0
+    for day in range(days, 0, -1):
+        pnl += rng.gauss(5, 60)
+        values.append([(today - timedelta(days=day)).strftime('%d.%m.%Y'), f"{15000 + pnl:.2f}", f"{pnl:.2f}"])
+    return values
+
+def install_stand_ins(fixtures, latency, spreadsheet):
+    dashboard.HTTP = functools.partial(FakeBybitHTTP, fixtures, latency)
+    dashboard.BlofinAPI = functools.partial(FakeBlofinAPI, fixtures, latency)
+    dashboard.connect_google_sheets = lambda: (FakeCredentials(), object(), spreadsheet)
+    # Platzhalter-Keys, damit der Closed-PnL-Sync die Bybit-Accounts einbezieht
+    for acc in dashboard.subaccounts:
+        acc['key'] = acc['key'] or f"bench-{acc['name']}"
+        acc['secret'] = acc['secret'] or 'bench'
+    # Keine Hintergrund-Refreshes während der Messung
+    for job in dashboard.refresh_jobs.values():
+        job['interval'] = float('inf')
+    dashboard.CLOSED_PNL_SYNC_INTERVAL = float('inf')
+
+def use_dashboard_db(path):
+    """Lokalen SQLite-Store auf eine eigene Datei umstellen"""
+    with dashboard.dashboard_db_lock:
+        if dashboard.dashboard_db['connection'] is not None:
+            dashboard.dashboard_db['connection'].close()
+        dashboard.dashboard_db['connection'] = None
+    dashboard.DASHBOARD_DB_PATH = path
+
+def reset_pipeline(cache_root):
+    """Kalter Start: In-Memory-Caches, Trade-Store, Snapshots, Sheets-Handles und Chart-Cache leeren"""
+    dashboard.dashboard_cache = dashboard.TTLCache(max_size=dashboard.CACHE_MAX_SIZE, default_ttl=dashboard.CACHE_DURATION)
+    with dashboard.trade_store_lock:
+        dashboard.trade_store.clear()
+    dashboard.closed_pnl_details.clear()
+    with dashboard.snapshot_lock:
+        dashboard.snapshots.clear()
+    with dashboard.sheets_lock:
+        dashboard.reset_google_sheets()
+    dashboard.CHART_CACHE_DIR = tempfile.mkdtemp(dir=cache_root)
+
+def measure(repeat, setup, func):
+    durations = []
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    durations.sort()
+    return {
+        'median': statistics.median(durations),
+        'p95': durations[min(len(durations) - 1, round(0.95 * (len(durations) - 1)))],
+        'min': durations[0]
+    }
+
+def pipeline_stages(client, cache_root):
+    """Gemessene Abschnitte: (setup, func) je Name; setup läuft vor jeder Wiederholung und wird nicht gemessen"""
+    def cold():
+        reset_pipeline(cache_root)
+    
+    def sheets():
+        return dashboard.setup_google_sheets()
+    
+    def cold_with_trades():
+        cold()
+        dashboard.get_trading_data_from_sheets(*sheets())
+    
+    def get_dashboard():
+        response = client.get('/dashboard')
+        if response.status_code != 200:
+            raise SystemExit(f"/dashboard antwortet mit {response.status_code}")
+    
+    def warm_dashboard():
+        cold()
+        get_dashboard()
+    
+    def historical_performance():
+        references = dashboard.get_historical_pnl_references(*sheets())
+        dashboard.calculate_historical_performance(1234.5, references)
+    
+    closed_pnl_backfill = {'done': False}
+    
+    def cold_with_closed_pnl():
+        # Der Backfill läuft wie im Scheduler über mehrere Syncs; gemessen wird danach ein inkrementeller Sync plus Laden
+        cold()
+        while not closed_pnl_backfill['done']:
+            dashboard.sync_closed_pnl()
+            stats = dashboard.closed_pnl_sync_stats
+            closed_pnl_backfill['done'] = not stats['backfilling'] or stats['failed']
+    
+    def trading_details_store():
+        dashboard.sync_closed_pnl()
+        return dashboard.load_trading_details()
+    
+    # Eigene SQLite-Datei je Lauf
+    use_dashboard_db(os.path.join(cache_root, 'dashboard.db'))
+    
+    cold()
+    account_data = dashboard.get_account_data()['account_data']
+    
+    return {
+        'account_data': (cold, dashboard.get_account_data),
+        'trading_details_full': (cold, lambda: dashboard.get_trading_data_from_sheets(*sheets())),
+        'trading_details_incremental': (cold_with_trades, lambda: dashboard.get_trading_data_from_sheets(*sheets())),
+        'trading_details_store': (cold_with_closed_pnl, trading_details_store),
+        'historical_performance': (cold, historical_performance),
+        'equity_chart': (cold, lambda: dashboard.create_equity_curve_chart(*sheets())),
+        'performance_charts': (cold, lambda: dashboard.create_cached_charts(account_data)),
+        'dashboard_cold': (cold, get_dashboard),
+        'dashboard_warm': (warm_dashboard, get_dashboard)
+    }
+
+def benchmark_pipeline(args):
+    """Misst die Pipeline-Abschnitte gegen die Stand-ins und vergleicht die Mediane mit einer gespeicherten Baseline"""
+    fixtures = {}
+    if args.fixtures:
+        with open(args.fixtures, encoding='utf-8') as f:
+            fixtures = json.load(f)
+    
+    rng = random.Random(args.seed)
+    sheets = fixtures.get('sheets') or synthetic_sheets(args.rows or PIPELINE_ROWS, args.seed)
+    sheets.setdefault('DailyBalances', synthetic_daily_balances(rng, args.days))
+    config = {'rows': args.rows or PIPELINE_ROWS, 'days': args.days, 'latency_ms': args.latency_ms,
+              'jitter_ms': args.jitter_ms, 'repeat': args.repeat, 'fixtures': args.fixtures}
+    
+    install_stand_ins(fixtures, Latency(args.latency_ms, args.jitter_ms, args.seed), FakeSpreadsheet(sheets, Latency(args.latency_ms, args.jitter_ms, args.seed + 1)))
+    dashboard.BYBIT_CLOSED_PNL_BACKFILL_DAYS = args.days
+    client = dashboard.app.test_client()
+    with client.session_transaction() as session:
+        session['user'] = 'admin'
+    
+    # Scheduler und Platzhalter-Rendering einmal vorab, damit sie keine Messung verfälschen
+    dashboard.ensure_refresher_started()
+    dashboard.chart_render_executor.submit(lambda: None).result()
+    
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline['config'] != config:
+            raise SystemExit(f"Baseline {args.baseline} wurde mit anderer Konfiguration erstellt: {baseline['config']}")
+    
+    results = {}
+    regressions = []
+    with tempfile.TemporaryDirectory() as cache_root:
+        for stage, (setup, func) in pipeline_stages(client, cache_root).items():
+            results[stage] = measure(args.repeat, setup, func)
+            line = f"{stage:<28} Median {results[stage]['median'] * 1000:8.1f}ms  p95 {results[stage]['p95'] * 1000:8.1f}ms  min {results[stage]['min'] * 1000:8.1f}ms"
+            
+            reference = baseline['stages'].get(stage) if baseline else None
+            if reference:
+                change = results[stage]['median'] / reference['median'] - 1 if reference['median'] else 0.0
+                line += f"  Baseline {reference['median'] * 1000:8.1f}ms ({change:+.0%})"
+                if results[stage]['median'] > reference['median'] * (1 + args.tolerance) + REGRESSION_FLOOR:
+                    line += "  REGRESSION"
+                    regressions.append(stage)
+            print(line)
+    
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'config': config, 'stages': results}, f, indent=2)
+        print(f"Baseline gespeichert: {args.baseline}")
+    if regressions:
+        raise SystemExit(f"Langsamer als die Baseline (>{args.tolerance:.0%}): {', '.join(regressions)}")
+
+def check_dashboard_sheets_reads(seed):
+    """Zwei /dashboard-Requests gegen die Stand-ins; der zweite darf Google Sheets nicht lesen. Liefert die Lesezugriffe je Request"""
+    rng = random.Random(seed)
+    sheets = synthetic_sheets(200, seed)
+    sheets['DailyBalances'] = synthetic_daily_balances(rng, 60)
+    spreadsheet = FakeSpreadsheet(sheets, Latency(0, 0, seed))
+    install_stand_ins({}, Latency(0, 0, seed), spreadsheet)
+    
+    client = dashboard.app.test_client()
+    with client.session_transaction() as session:
+        session['user'] = 'admin'
+    
+    reads = []
+    db_path = dashboard.DASHBOARD_DB_PATH
+    with tempfile.TemporaryDirectory() as cache_root:
+        reset_pipeline(cache_root)
+        use_dashboard_db(os.path.join(cache_root, 'dashboard.db'))
+        for _ in range(2):
+            before = Counter(spreadsheet.reads)
+            response = client.get('/dashboard')
+            if response.status_code != 200:
+                raise SystemExit(f"/dashboard antwortet mit {response.status_code}")
+            # Vom Request angestoßene Render-Jobs mitzählen
+            dashboard.chart_render_executor.submit(lambda: None).result()
+            reads.append(spreadsheet.reads - before)
+        use_dashboard_db(db_path)
+    return reads
+
+def benchmark_trade_parsing(rows, seed):
+    sheets = synthetic_sheets(rows, seed)
+
+    total_reference = total_columnar = 0
+    mismatches = []
+    for sheet_name, values in sheets.items():
+        start = time.perf_counter()
+        expected = row_by_row(sheet_name, values)
+        reference_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = columnar(sheet_name, values)
+        columnar_time = time.perf_counter() - start
+
+        total_reference += reference_time
+        total_columnar += columnar_time
+        same = comparable(expected) == comparable(actual)
+        if not same:
+            mismatches.append(sheet_name)
+        print(f"{sheet_name:<16} {actual['total_trades']:>7} Trades  zeilenweise {reference_time:7.3f}s  spaltenweise {columnar_time:7.3f}s  {'OK' if same else 'ABWEICHUNG'}")
+
+    print(f"Gesamt: zeilenweise {total_reference:.3f}s, spaltenweise {total_columnar:.3f}s (Faktor {total_reference / total_columnar:.1f}x)")
+    if mismatches:
+        raise SystemExit(f"Ergebnisse weichen ab: {', '.join(mismatches)}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, help=f"Zeilen pro Account-Sheet (Standard: 100000, mit --pipeline {PIPELINE_ROWS})")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--charts', action='store_true', help='Nur das Größenbudget der Chart-Bilder prüfen')
+    parser.add_argument('--sheets-reads', action='store_true', help='Nur prüfen, dass ein zweiter /dashboard-Request nichts aus Google Sheets liest')
+    parser.add_argument('--equity-years', type=int, metavar='JAHRE', help='Nur die Equity Curve über JAHRE synthetische Tage benchmarken')
+    parser.add_argument('--pipeline', action='store_true', help='Dashboard-Pipeline gegen lokale Bybit/Blofin/Sheets-Stand-ins messen')
+    parser.add_argument('--latency-ms', type=float, default=50, help='Mittlere Latenz je Stand-in-Aufruf')
+    parser.add_argument('--jitter-ms', type=float, default=15, help='Standardabweichung der Latenz')
+    parser.add_argument('--days', type=int, default=365, help='Zeilen in DailyBalances')
+    parser.add_argument('--repeat', type=int, default=5, help='Wiederholungen je Abschnitt')
+    parser.add_argument('--fixtures', help='JSON mit aufgezeichneten Antworten (bybit_wallet, bybit_positions, blofin_balance, blofin_positions, sheets)')
+    parser.add_argument('--baseline', default='benchmark_baseline.json',
+                        help='Baseline-Datei für den Regressionsvergleich; Messwerte hängen vom Rechner ab, daher nur lokal (per .gitignore nicht versioniert)')
+    parser.add_argument('--save-baseline', action='store_true', help='Ergebnisse als neue Baseline speichern')
+    parser.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE, help='Erlaubte Verlangsamung des Medians (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    if args.pipeline:
+        benchmark_pipeline(args)
+        return
+    if args.equity_years:
+        benchmark_equity_curve(args.equity_years, args.seed)
+        return
+    if args.sheets_reads:
+        first, second = check_dashboard_sheets_reads(args.seed)
+        print(f"Sheets-Lesezugriffe: erster Request {dict(first)}, zweiter Request {dict(second)}")
+        if sum(second.values()):
+            raise SystemExit("Zweiter /dashboard-Request liest aus Google Sheets")
+        return
+    if args.charts:
+        over_budget = check_chart_budget(args.seed)
+        if over_budget:
+            raise SystemExit("Chart-Budget überschritten:\n" + "\n".join(over_budget))
+        return
+    
+    benchmark_trade_parsing(args.rows or 100000, args.seed)
+
+if __name__ == '__main__':
+    main()
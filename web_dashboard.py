@@ -2,30 +2,139 @@ import os
 import logging
 import matplotlib
 matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+import matplotlib.style
+from matplotlib.figure import Figure
+from PIL import Image
 from datetime import datetime, timedelta
-from flask import Flask, render_template, request, redirect, session, url_for, jsonify
+from flask import Flask, render_template, request, redirect, session, url_for, jsonify, send_file, g, has_request_context
 from werkzeug.security import generate_password_hash, check_password_hash
 from pybit.unified_trading import HTTP
 from pytz import timezone
 import pandas as pd
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
 import hmac
 import hashlib
 import time
 import json
 import base64
 import uuid
+import io
+import shutil
+import re
+import atexit
+import sqlite3
 import gspread
+from gspread.utils import numericise, numericise_all
 import random
 from google.oauth2.service_account import Credentials
+from google.auth.transport.requests import Request as GoogleAuthRequest
 from functools import wraps
-from threading import Lock
+from contextlib import contextmanager
+from bisect import bisect_left
+from threading import Lock, BoundedSemaphore, Thread
+from concurrent.futures import ThreadPoolExecutor, wait
+from collections import OrderedDict, Counter, deque
 
 # Globale Cache-Variablen
-cache_lock = Lock()
-dashboard_cache = {}
 CACHE_DURATION = 300
+CACHE_MAX_SIZE = int(os.environ.get("CACHE_MAX_SIZE", "256"))
+# Bucket-Grenzen (Sekunden) der Laufzeit-Histogramme unter /metrics; METRICS_TOKEN erlaubt Scrapes ohne Login
+METRIC_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+DAILY_BALANCES_CACHE_DURATION = int(os.environ.get("DAILY_BALANCES_CACHE_DURATION", "300"))
+
+# Parallele Exchange-Abfragen
+ACCOUNT_FETCH_DEADLINE = float(os.environ.get("ACCOUNT_FETCH_DEADLINE", "20"))
+EXCHANGE_CONCURRENCY = {
+    "bybit": int(os.environ.get("BYBIT_MAX_CONCURRENCY", "5")),
+    "blofin": int(os.environ.get("BLOFIN_MAX_CONCURRENCY", "1"))
+}
+exchange_semaphores = {exchange: BoundedSemaphore(limit) for exchange, limit in EXCHANGE_CONCURRENCY.items()}
+
+# Blofin HTTP: gemeinsame Keep-Alive-Session, getrennte Connect/Read-Timeouts, Retries bei 429/5xx
+BLOFIN_CONNECT_TIMEOUT = float(os.environ.get("BLOFIN_CONNECT_TIMEOUT", "3.05"))
+BLOFIN_READ_TIMEOUT = float(os.environ.get("BLOFIN_READ_TIMEOUT", "15"))
+BLOFIN_MAX_RETRIES = int(os.environ.get("BLOFIN_MAX_RETRIES", "3"))
+BLOFIN_RETRY_BACKOFF = float(os.environ.get("BLOFIN_RETRY_BACKOFF", "0.5"))
+BLOFIN_RETRY_STATUS = (429, 500, 502, 503, 504)
+blofin_clients_lock = Lock()
+blofin_clients = {}
+# Bybit: ein langlebiger pybit-Client pro Subaccount (Connection-Pool bleibt über Refreshes erhalten)
+bybit_clients_lock = Lock()
+bybit_clients = {}
+account_futures_lock = Lock()
+account_futures = {}
+
+# Snapshots werden im Hintergrund aktualisiert (stale-while-revalidate)
+ACCOUNT_REFRESH_INTERVAL = int(os.environ.get("ACCOUNT_REFRESH_INTERVAL", "60"))
+SHEETS_REFRESH_INTERVAL = int(os.environ.get("SHEETS_REFRESH_INTERVAL", "900"))
+snapshot_lock = Lock()
+snapshots = {}
+refresher_lock = Lock()
+refresher_thread = None
+
+# Write-behind für DailyBalances: Seitenaufrufe puffern nur den letzten Stand je Tag, der Scheduler schreibt
+DAILY_FLUSH_INTERVAL = int(os.environ.get("DAILY_FLUSH_INTERVAL", "300"))
+daily_journal_lock = Lock()
+daily_journal = OrderedDict()
+daily_rows = {}
+daily_flush_job = {'lock': Lock(), 'last_run': 0.0}
+
+# Prozessweite Google Sheets Verbindung und Worksheet-Handles
+WORKSHEET_MAP_REFRESH = int(os.environ.get("WORKSHEET_MAP_REFRESH", "300"))
+sheets_lock = Lock()
+sheets_connection = {'credentials': None, 'gc': None, 'spreadsheet': None}
+worksheet_handles_lock = Lock()
+worksheet_handles = {}
+SHEETS_READS_PER_MINUTE = int(os.environ.get("SHEETS_READS_PER_MINUTE", "60"))
+
+# Inkrementeller Trade-Store: pro Worksheet High-Water-Mark und fortgeschriebene Aggregate
+TRADE_FULL_RESCAN_INTERVAL = int(os.environ.get("TRADE_FULL_RESCAN_INTERVAL", "21600"))
+trade_store_lock = Lock()
+trade_store = {}
+
+# Trace-Modus: zeilenweise Detail-Logs für genau ein Trade-Sheet (TRACE_SHEET oder /debug-trace)
+trace_sheet = os.environ.get("TRACE_SHEET") or None
+ROW_WARNING_SAMPLE = 3
+trade_sync_stats = {}
+
+# Lokaler Store (SQLite, WAL) für Bybit Closed PnL und die Balance-Historie
+DASHBOARD_DB_PATH = os.environ.get("DASHBOARD_DB_PATH", "data/dashboard.db")
+BYBIT_CLOSED_PNL_BACKFILL_DAYS = int(os.environ.get("BYBIT_CLOSED_PNL_BACKFILL_DAYS", "730"))
+BYBIT_CLOSED_PNL_PAGE_SIZE = 100
+BYBIT_CLOSED_PNL_WINDOW_MS = 7 * 24 * 3600 * 1000 - 1
+BYBIT_CLOSED_PNL_OVERLAP_MS = 10 * 60 * 1000
+# Der Sync läuft nur im Scheduler; pro Lauf und Account höchstens so viele Sekunden, der Backfill setzt im nächsten Lauf fort
+CLOSED_PNL_SYNC_INTERVAL = int(os.environ.get("CLOSED_PNL_SYNC_INTERVAL", "60"))
+BYBIT_CLOSED_PNL_SYNC_BUDGET = float(os.environ.get("BYBIT_CLOSED_PNL_SYNC_BUDGET", "10"))
+closed_pnl_sync_job = {'lock': Lock(), 'last_run': 0.0}
+dashboard_db_lock = Lock()
+dashboard_db = {'connection': None}
+closed_pnl_details = {}
+closed_pnl_sync_stats = {}
+
+# Balance-Historie: Tageswerte und Intraday-Snapshots je Account und gesamt; DailyBalances ist nur noch Spiegel
+BALANCE_TOTAL = "Gesamt"
+INTRADAY_SNAPSHOT_INTERVAL = int(os.environ.get("INTRADAY_SNAPSHOT_INTERVAL", "900"))
+INTRADAY_RETENTION_DAYS = int(os.environ.get("INTRADAY_RETENTION_DAYS", "90"))
+balance_snapshot_state = {'last_taken': 0.0}
+
+# Gerenderte Charts liegen im Chart-Cache unter dem Content-Hash ihrer Eingabedaten (gemeinsam für alle Worker-Prozesse)
+CHART_CACHE_DIR = os.environ.get("CHART_CACHE_DIR", "static/chart_cache")
+CHART_CACHE_KEEP = int(os.environ.get("CHART_CACHE_KEEP", "20"))
+chart_cache_stats = Counter()
+# Jede Chart-Datei gibt es in mehreren Breiten als PNG und WebP (srcset im Template), ohne Breite wird CHART_DEFAULT_WIDTH ausgeliefert
+CHART_WIDTHS = (480, 960, 1600)
+CHART_DEFAULT_WIDTH = 960
+CHART_FORMATS = {'png': 'image/png', 'webp': 'image/webp'}
+# Content-Hash (ETag) und aktuell ausgelieferter Basis-Pfad pro Chart (im Degraded Mode ein vorgerenderter Platzhalter)
+chart_versions = {}
+chart_sources = {}
+CHART_RENDER_TIMEOUT = int(os.environ.get("CHART_RENDER_TIMEOUT", "60"))
+# Punkte-Budget der Equity Curve (PNG und /chart-data/equity), 0 = alle Tage zeichnen
+EQUITY_CURVE_MAX_POINTS = int(os.environ.get("EQUITY_CURVE_MAX_POINTS", "1000"))
 
 app = Flask(__name__)
 app.secret_key = 'supergeheim'
@@ -52,6 +161,24 @@ subaccounts = [
     {"name": "7 Tage Performer", "key": os.environ.get("BLOFIN_API_KEY"), "secret": os.environ.get("BLOFIN_API_SECRET"), "passphrase": os.environ.get("BLOFIN_API_PASSPHRASE"), "exchange": "blofin"}
 ]
 
+# Trade-Worksheets pro Account
+sheet_mapping = {
+    "Incubator": "Incubatorzone",
+    "Meme": "Memestrategies", 
+    "Ethape": "Ethapestrategies",
+    "Alts": "Altsstrategies",
+    "Sol": "Solstrategies",
+    "Btc": "Btcstrategies",
+    "Core": "Corestrategies",
+    "2k-10k": "2k->10k Projekt",
+    "1k-5k": "1k->5k Projekt",
+    "Claude": "Claude Projekt",
+    "Blofin-7-Tage": "7 Tage Performer"
+}
+
+# Ein Worker pro Account reicht, da pro Account nur ein Abruf gleichzeitig läuft
+account_fetch_executor = ThreadPoolExecutor(max_workers=len(subaccounts), thread_name_prefix="account-fetch")
+
 # Startkapital
 startkapital = {
     "Incubatorzone": 400.00,
@@ -71,26 +198,245 @@ def cache_key_generator(*args, **kwargs):
     key_data = str(args) + str(sorted(kwargs.items()))
     return hashlib.md5(key_data.encode()).hexdigest()
 
-def cached_function(cache_duration=300):
+_MISSING = object()
+
+class TTLCache:
+    """Thread-sicherer LRU-Cache mit TTL pro Eintrag und Single-Flight bei Cache-Misses"""
+    
+    def __init__(self, max_size=256, default_ttl=300):
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self._key_locks = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def _lookup(self, key):
+        # Aufrufer hält self._lock
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        
+        value, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            self.expirations += 1
+            return _MISSING
+        
+        self._entries.move_to_end(key)
+        return value
+    
+    def _store(self, key, value, ttl):
+        # Aufrufer hält self._lock
+        now = time.monotonic()
+        self._entries[key] = (value, now + (ttl if ttl is not None else self.default_ttl))
+        self._entries.move_to_end(key)
+        
+        for expired_key in [k for k, (_, expires_at) in self._entries.items() if expires_at <= now]:
+            del self._entries[expired_key]
+            self.expirations += 1
+        
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._lookup(key)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+    
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._store(key, value, ttl)
+    
+    def get_or_compute(self, key, compute, ttl=None):
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+            key_lock = self._key_locks.setdefault(key, Lock())
+        
+        # Nur ein Thread berechnet pro Key, gleichzeitige Misses warten auf dessen Ergebnis
+        with key_lock:
+            with self._lock:
+                value = self._lookup(key)
+                if value is not _MISSING:
+                    self.coalesced += 1
+                    return value
+                self.misses += 1
+            
+            try:
+                value = compute()
+                with self._lock:
+                    self._store(key, value, ttl)
+                return value
+            finally:
+                with self._lock:
+                    if self._key_locks.get(key) is key_lock:
+                        del self._key_locks[key]
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_ratio': (self.hits + self.coalesced) / lookups if lookups else 0.0
+            }
+    
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+dashboard_cache = TTLCache(max_size=CACHE_MAX_SIZE, default_ttl=CACHE_DURATION)
+
+class RateLimiter:
+    """Sliding-Window-Limiter; blockiert erst, wenn max_calls pro period ausgeschöpft sind"""
+    
+    def __init__(self, max_calls, period):
+        self.max_calls = max_calls
+        self.period = period
+        self._calls = deque()
+        self._lock = Lock()
+    
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= self.period:
+                    self._calls.popleft()
+                
+                if len(self._calls) < self.max_calls:
+                    self._calls.append(now)
+                    return
+                
+                wait_time = self.period - (now - self._calls[0])
+            
+            time.sleep(wait_time)
+
+# Google Sheets Read-Quota (pro Minute und User)
+sheets_rate_limiter = RateLimiter(SHEETS_READS_PER_MINUTE, 60)
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = [(key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for key, value in labels]
+    return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+
+class Histogram:
+    """Prometheus-Histogramm (kumulative Buckets, Summe, Anzahl) je Label-Kombination"""
+    
+    def __init__(self, name, description, buckets=METRIC_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self._series = {}
+        self._lock = Lock()
+    
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            index = bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series['buckets'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+    
+    def exposition(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series['buckets']):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{format_labels(key + (('le', f'{bound:g}'),))} {cumulative}")
+                lines.append(f"{self.name}_bucket{format_labels(key + (('le', '+Inf'),))} {series['count']}")
+                lines.append(f"{self.name}_sum{format_labels(key)} {series['sum']:.6f}")
+                lines.append(f"{self.name}_count{format_labels(key)} {series['count']}")
+        return lines
+
+# Laufzeiten für /metrics; die _count-Reihen sind zugleich die Aufrufzähler
+request_seconds = Histogram('dashboard_request_duration_seconds', 'Dauer der HTTP-Requests je Endpoint')
+stage_seconds = Histogram('dashboard_stage_duration_seconds', 'Dauer einzelner Abschnitte (Snapshots, Sheets-Setup, Templates, ...)')
+exchange_seconds = Histogram('exchange_request_duration_seconds', 'Dauer der Balance/Positions-Abrufe je Exchange und Account')
+sheets_seconds = Histogram('sheets_request_duration_seconds', 'Dauer der Google Sheets API-Aufrufe je Operation')
+chart_render_seconds = Histogram('chart_render_duration_seconds', 'Render-Dauer je Chart (inkl. PNG/WebP-Varianten)')
+bybit_client_seconds = Histogram('bybit_client_request_duration_seconds', 'Dauer der pybit-Aufrufe je Subaccount und Methode')
+
+@contextmanager
+def timed(stage, histogram=None, **labels):
+    """Misst einen Abschnitt: Histogramm für /metrics und, innerhalb eines Requests, ein Eintrag im Server-Timing-Header
+    
+    Ohne histogram landet die Dauer in stage_seconds mit dem Label stage."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - started
+        if histogram is None:
+            stage_seconds.observe(duration, stage=stage)
+        else:
+            histogram.observe(duration, **labels)
+        if has_request_context():
+            g.setdefault('server_timing', []).append((stage, duration))
+
+def cached_function(cache_duration=300, key_func=None):
+    """key_func ersetzt den Standard-Key aus str(args), z.B. um Client-Handles zu ignorieren"""
     def decorator(func):
+        def make_key(*args, **kwargs):
+            key_source = key_func or cache_key_generator
+            return f"{func.__name__}_{key_source(*args, **kwargs)}"
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
-            cache_key = f"{func.__name__}_{cache_key_generator(*args, **kwargs)}"
+            cache_key = make_key(*args, **kwargs)
             
-            with cache_lock:
-                if cache_key in dashboard_cache:
-                    cached_data, timestamp = dashboard_cache[cache_key]
-                    if datetime.now() - timestamp < timedelta(seconds=cache_duration):
-                        logging.info(f"Cache hit for {func.__name__}")
-                        return cached_data
-                
-                logging.info(f"Cache miss for {func.__name__} - executing")
-                result = func(*args, **kwargs)
-                dashboard_cache[cache_key] = (result, datetime.now())
-                return result
+            def compute():
+                logging.debug("Cache miss for %s - executing", func.__name__)
+                return func(*args, **kwargs)
+            
+            return dashboard_cache.get_or_compute(cache_key, compute, ttl=cache_duration)
+        
+        def store(value, *args, **kwargs):
+            dashboard_cache.set(make_key(*args, **kwargs), value, ttl=cache_duration)
+        
+        def invalidate(*args, **kwargs):
+            dashboard_cache.delete(make_key(*args, **kwargs))
+        
+        def peek(*args, **kwargs):
+            # Nur der gecachte Wert (oder None), ohne func aufzurufen
+            return dashboard_cache.get(make_key(*args, **kwargs))
+        
+        wrapper.store = store
+        wrapper.invalidate = invalidate
+        wrapper.peek = peek
         return wrapper
     return decorator
 
+def spreadsheet_key(*worksheet_names):
+    """Key-Funktion für Sheets-Funktionen: keyt auf Spreadsheet-ID und Worksheet-Namen statt auf gc/spreadsheet-Objekte"""
+    def key_func(gc, spreadsheet, *args, **kwargs):
+        spreadsheet_id = getattr(spreadsheet, 'id', None)
+        return cache_key_generator(spreadsheet_id, *worksheet_names, *args, **kwargs)
+    return key_func
+
 def safe_timestamp_convert(timestamp):
     try:
         if isinstance(timestamp, str):
@@ -106,7 +452,7 @@ def safe_timestamp_convert(timestamp):
     except (ValueError, TypeError, OSError):
         return int(time.time() * 1000)
 
-def setup_google_sheets():
+def connect_google_sheets():
     try:
         service_account_json = os.environ.get("GOOGLE_SERVICE_ACCOUNT_JSON")
         spreadsheet_id = os.environ.get("GOOGLE_SHEET_ID")
@@ -131,17 +477,65 @@ def setup_google_sheets():
         
         credentials = Credentials.from_service_account_info(service_account_info, scopes=scopes)
         gc = gspread.authorize(credentials)
-        
-        spreadsheet = gc.open_by_key(spreadsheet_id)
-        sheet = spreadsheet.worksheet("DailyBalances")
+        with timed('sheets', sheets_seconds, operation='open_by_key'):
+            spreadsheet = gc.open_by_key(spreadsheet_id)
         
         logging.info("Google Sheets erfolgreich verbunden")
-        return gc, spreadsheet
+        return credentials, gc, spreadsheet
         
     except Exception as e:
         logging.error(f"Google Sheets Setup Fehler: {e}")
         return None
 
+def setup_google_sheets():
+    """Liefert den prozessweiten (gc, spreadsheet)-Handle; verbindet nur beim ersten Aufruf"""
+    with sheets_lock:
+        credentials = sheets_connection['credentials']
+        
+        if credentials is not None and not credentials.valid:
+            try:
+                credentials.refresh(GoogleAuthRequest())
+                logging.info("Google Sheets Token erneuert")
+            except Exception as e:
+                logging.error(f"Google Sheets Token-Erneuerung fehlgeschlagen: {e}")
+                reset_google_sheets()
+        
+        if sheets_connection['spreadsheet'] is None:
+            connection = connect_google_sheets()
+            if not connection:
+                return None
+            
+            sheets_connection['credentials'], sheets_connection['gc'], sheets_connection['spreadsheet'] = connection
+        
+        return sheets_connection['gc'], sheets_connection['spreadsheet']
+
+def reset_google_sheets():
+    # Aufrufer hält sheets_lock
+    sheets_connection.update({'credentials': None, 'gc': None, 'spreadsheet': None})
+    with worksheet_handles_lock:
+        worksheet_handles.clear()
+
+def get_worksheet(spreadsheet, name):
+    """Liefert ein Worksheet-Handle aus der Handle-Map statt bei jedem Zugriff die Metadaten zu laden"""
+    with worksheet_handles_lock:
+        handles = worksheet_handles.get(spreadsheet.id)
+        now = time.time()
+        
+        # Map mit einem einzigen worksheets()-Call laden; unbekannte Namen frühestens nach WORKSHEET_MAP_REFRESH erneut prüfen
+        if handles is None or (name not in handles['worksheets'] and now - handles['loaded_at'] > WORKSHEET_MAP_REFRESH):
+            with timed('sheets', sheets_seconds, operation='worksheets'):
+                worksheets = spreadsheet.worksheets()
+            handles = {
+                'worksheets': {worksheet.title: worksheet for worksheet in worksheets},
+                'loaded_at': now
+            }
+            worksheet_handles[spreadsheet.id] = handles
+    
+    worksheet = handles['worksheets'].get(name)
+    if worksheet is None:
+        raise gspread.exceptions.WorksheetNotFound(name)
+    return worksheet
+
 def clean_numeric_value(value_str):
     """Bereinige numerische Werte von Währungssymbolen und Formatierung"""
     if not value_str:
@@ -156,667 +550,1573 @@ def clean_numeric_value(value_str):
     
     return clean_val if clean_val else "0"
 
-def get_trading_data_from_sheets(gc, spreadsheet):
-    sheet_mapping = {
-        "Incubator": "Incubatorzone",
-        "Meme": "Memestrategies", 
-        "Ethape": "Ethapestrategies",
-        "Alts": "Altsstrategies",
-        "Sol": "Solstrategies",
-        "Btc": "Btcstrategies",
-        "Core": "Corestrategies",
-        "2k-10k": "2k->10k Projekt",
-        "1k-5k": "1k->5k Projekt",
-        "Claude": "Claude Projekt",
-        "Blofin-7-Tage": "7 Tage Performer"
+def sheet_range(sheet_name):
+    # A1-Notation für ein komplettes Worksheet
+    return "'" + sheet_name.replace("'", "''") + "'"
+
+def empty_account_details(account_name):
+    return {
+        'name': account_name,
+        'has_data': False,
+        'total_trades': 0,
+        'win_rate': 0,
+        'total_pnl': 0,
+        'profit_factor': 0,
+        'avg_trade': 0,
+        'max_drawdown': 0,
+        'recent_trades': [],
+        'all_trades': []
     }
+
+# Kandidaten-Spalten pro Trade-Feld in Prioritätsreihenfolge
+BLOFIN_PNL_COLUMNS = [
+    'PNL', 'PnL', 'pnl', 'Pnl', 'profit', 'Profit', 'profit_loss', 'net_pnl',
+    'P&L', 'P/L', 'Gewinn', 'gewinn', 'Verlust', 'verlust',
+    'Ergebnis', 'ergebnis', 'Result', 'result', 'Realized P&L', 'realized_pnl',
+    'Unrealized P&L', 'unrealized_pnl', 'Total P&L', 'total_pnl',
+    'Net Profit', 'net_profit', 'Trading Result', 'trading_result',
+    'Position PnL', 'position_pnl', 'Final PnL', 'final_pnl'
+]
+BLOFIN_SYMBOL_COLUMNS = [
+    'Underlying Asset', 'Symbol', 'symbol', 'Asset', 'asset', 'Coin', 'coin',
+    'Instrument', 'instrument', 'Pair', 'pair', 'Currency', 'currency',
+    'instId', 'InstId', 'underlying', 'Underlying'
+]
+TRADE_DATE_COLUMNS = [
+    'Filled/Settlement Time(UTC+0)', 'Create Time', 'Order Time',
+    'Date', 'date', 'Datum', 'datum', 'Time', 'time', 'Timestamp', 'timestamp',
+    'Created', 'created', 'Executed', 'executed', 'Open Time', 'Close Time'
+]
+TRADE_SIDE_COLUMNS = [
+    'Trade Type', 'Side', 'side', 'Direction', 'direction', 'Type', 'type',
+    'Action', 'action', 'Order Type', 'order_type', 'Position', 'position'
+]
+TRADE_SIZE_COLUMNS = [
+    'Qty', 'Size', 'size', 'Quantity', 'quantity', 'Amount', 'amount', 'qty',
+    'Volume', 'volume', 'Menge', 'menge', 'Contracts', 'contracts', 'Filled', 'Total'
+]
+TRADE_ENTRY_COLUMNS = [
+    'Entry Price', 'Avg Fill', 'entry', 'Entry_Price', 'entry_price', 'Buy_Price', 'buy_price', 
+    'Open_Price', 'open_price', 'Einstieg', 'einstieg', 'Open', 'open',
+    'Einstiegspreis', 'Opening Price'
+]
+TRADE_EXIT_COLUMNS = [
+    'Filled Price', 'Exit', 'exit', 'Exit_Price', 'exit_price', 'Sell_Price', 'sell_price', 
+    'Close_Price', 'close_price', 'Ausstieg', 'ausstieg', 'Close', 'close',
+    'Exit Price', 'Ausstiegspreis', 'Closing Price'
+]
+
+def resolve_trade_columns(sheet_name, headers):
+    """Prüft die Header-Zeile einmal pro Sheet: welche Kandidaten-Spalten pro Feld vorhanden sind (als (Name, Index))"""
+    # Bei doppelten Headern gewinnt wie bei get_all_records() die letzte Spalte
+    header_index = {header: i for i, header in enumerate(headers)}
+    is_blofin = sheet_name == "Blofin-7-Tage"
     
-    account_details = []
+    candidates = {
+        'pnl': BLOFIN_PNL_COLUMNS if is_blofin else ['Realized P&L'],
+        'fee': ['Fee'] if is_blofin else [],
+        'symbol': BLOFIN_SYMBOL_COLUMNS if is_blofin else ['Contracts'],
+        'date': TRADE_DATE_COLUMNS,
+        'side': TRADE_SIDE_COLUMNS,
+        'size': TRADE_SIZE_COLUMNS,
+        'entry': TRADE_ENTRY_COLUMNS,
+        'exit': TRADE_EXIT_COLUMNS
+    }
     
-    for sheet_name, account_name in sheet_mapping.items():
-        try:
-            logging.info(f"Lade Daten aus Sheet: {sheet_name} für Account: {account_name}")
-            
-            try:
-                worksheet = spreadsheet.worksheet(sheet_name)
-            except gspread.exceptions.WorksheetNotFound:
-                logging.warning(f"Worksheet '{sheet_name}' nicht gefunden")
-                account_details.append({
-                    'name': account_name,
-                    'has_data': False,
-                    'total_trades': 0,
-                    'win_rate': 0,
-                    'total_pnl': 0,
-                    'profit_factor': 0,
-                    'avg_trade': 0,
-                    'max_drawdown': 0,
-                    'recent_trades': [],
-                    'all_trades': []
-                })
-                continue
-            
-            try:
-                all_records = worksheet.get_all_records()
-                logging.info(f"Gefunden: {len(all_records)} Datensätze in {sheet_name}")
-                time.sleep(0.5)
-            except Exception as e:
-                logging.error(f"Fehler beim Lesen der Daten: {e}")
-                account_details.append({
-                    'name': account_name,
-                    'has_data': False,
-                    'total_trades': 0,
-                    'win_rate': 0,
-                    'total_pnl': 0,
-                    'profit_factor': 0,
-                    'avg_trade': 0,
-                    'max_drawdown': 0,
-                    'recent_trades': [],
-                    'all_trades': []
-                })
-                continue
-            
-            if not all_records:
-                logging.info(f"Keine Daten in {sheet_name}")
-                account_details.append({
-                    'name': account_name,
-                    'has_data': False,
-                    'total_trades': 0,
-                    'win_rate': 0,
-                    'total_pnl': 0,
-                    'profit_factor': 0,
-                    'avg_trade': 0,
-                    'max_drawdown': 0,
-                    'recent_trades': [],
-                    'all_trades': []
-                })
-                continue
-            
-            if all_records:
-                available_columns = list(all_records[0].keys())
-                logging.info(f"Verfügbare Spalten in {sheet_name}: {available_columns}")
-                
-                # DEBUG: Zeige erste 3 Zeilen für Blofin
-                if sheet_name == "Blofin-7-Tage":
-                    logging.info(f"Erste 3 Zeilen von Blofin: {all_records[:3]}")
-            
-            trades = []
-            total_pnl = 0
-            winning_trades = 0
-            total_profit = 0
-            total_loss = 0
+    return {
+        field: [(col, header_index[col]) for col in columns if col in header_index]
+        for field, columns in candidates.items()
+    }
+
+def column_report(columns):
+    # Primäre Spalte pro Feld; weitere Kandidaten greifen nur, wenn diese in einer Zeile leer ist
+    return {field: (candidates[0][0] if candidates else None) for field, candidates in columns.items()}
+
+def compile_trade_extractor(sheet_name, account_name, headers, trace=False):
+    """Baut einmal pro Sheet einen Extraktor, der eine Zeile (Liste in Header-Reihenfolge) in einen Trade umwandelt; trace=True loggt jede Zeile"""
+    columns = resolve_trade_columns(sheet_name, headers)
+    is_blofin = sheet_name == "Blofin-7-Tage"
+    pnl_columns = columns['pnl']
+    fee_index = columns['fee'][0][1] if columns['fee'] else None
+    symbol_columns = columns['symbol']
+    date_columns = columns['date']
+    side_columns = columns['side']
+    size_columns = columns['size']
+    entry_columns = columns['entry']
+    exit_columns = columns['exit']
+    
+    def extract(row):
+        pnl_value = 0
+        
+        # VERBESSERTE PNL EXTRAKTION FÜR BLOFIN
+        if is_blofin:
+            for col, i in pnl_columns:
+                value = row[i]
+                if value != '' and value is not None and value != '--' and value != 'N/A':
+                    try:
+                        clean_value = clean_numeric_value(value)
+                        if clean_value and clean_value != '0':
+                            pnl_value = float(clean_value)
+                            if trace:
+                                logging.info("[TRACE] Blofin PnL gefunden in Spalte '%s': %s (Original: %s)", col, pnl_value, value)
+                            break
+                    except (ValueError, TypeError) as e:
+                        if trace:
+                            logging.info("[TRACE] Fehler beim Parsen von Blofin PnL in Spalte '%s': %s", col, e)
+                        continue
             
-            for record in all_records:
+            # Falls kein PnL gefunden wurde, verwende Fee als negativen PnL
+            if pnl_value == 0:
+                fee_str = row[fee_index] if fee_index is not None else '0'
                 try:
-                    logging.debug(f"Verarbeite Zeile: {record}")
-                    
-                    pnl_value = 0
-                    
-                    # VERBESSERTE PNL EXTRAKTION FÜR BLOFIN
-                    if sheet_name == "Blofin-7-Tage":
-                        # Erweiterte PnL-Suche für Blofin
-                        pnl_columns = [
-                            'PNL', 'PnL', 'pnl', 'Pnl', 'profit', 'Profit', 'profit_loss', 'net_pnl',
-                            'P&L', 'P/L', 'Gewinn', 'gewinn', 'Verlust', 'verlust',
-                            'Ergebnis', 'ergebnis', 'Result', 'result', 'Realized P&L', 'realized_pnl',
-                            'Unrealized P&L', 'unrealized_pnl', 'Total P&L', 'total_pnl',
-                            'Net Profit', 'net_profit', 'Trading Result', 'trading_result',
-                            'Position PnL', 'position_pnl', 'Final PnL', 'final_pnl'
-                        ]
-                        
-                        for col in pnl_columns:
-                            if col in record and record[col] != '' and record[col] is not None and record[col] != '--' and record[col] != 'N/A':
-                                try:
-                                    clean_value = clean_numeric_value(record[col])
-                                    if clean_value and clean_value != '0':
-                                        pnl_value = float(clean_value)
-                                        logging.info(f"Blofin PnL gefunden in Spalte '{col}': {pnl_value} (Original: {record[col]})")
-                                        break
-                                except (ValueError, TypeError) as e:
-                                    logging.debug(f"Fehler beim Parsen von Blofin PnL in Spalte '{col}': {e}")
-                                    continue
-                        
-                        # Falls kein PnL gefunden wurde, verwende Fee als negativen PnL
-                        if pnl_value == 0:
-                            fee_str = record.get('Fee', '0')
-                            try:
-                                if 'USDT' in str(fee_str):
-                                    fee_value = float(clean_numeric_value(fee_str))
-                                    pnl_value = -fee_value  # Fee als Verlust
-                                    logging.info(f"Blofin: Verwende Fee als PnL: {pnl_value} (Original Fee: {fee_str})")
-                                elif pnl_value == 0:
-                                    pnl_value = -0.01  # Minimal-Verlust für Statistiken
-                            except:
-                                pnl_value = -0.01  # Fallback Minimal-Verlust
-                    else:
-                        # Standard PnL Extraktion für Bybit
-                        if 'Realized P&L' in record and record['Realized P&L'] is not None:
-                            try:
-                                clean_value = clean_numeric_value(record['Realized P&L'])
-                                if clean_value and clean_value != '0':
-                                    pnl_value = float(clean_value)
-                                    logging.debug(f"PnL gefunden in 'Realized P&L': {pnl_value}")
-                            except (ValueError, TypeError) as e:
-                                logging.debug(f"Fehler beim Parsen von PnL: {e}")
-                    
-                    # Symbol Extraktion
-                    symbol = 'N/A'
-                    
-                    if sheet_name != "Blofin-7-Tage":
-                        if 'Contracts' in record and record['Contracts'] is not None:
-                            contracts_value = str(record['Contracts']).strip()
-                            if contracts_value:
-                                symbol = contracts_value.replace('USDT', '').replace('1000PEPE', 'PEPE').strip()
-                                if symbol:
-                                    logging.debug(f"Symbol aus 'Contracts' extrahiert: {symbol}")
-                    else:
-                        symbol_columns = [
-                            'Underlying Asset', 'Symbol', 'symbol', 'Asset', 'asset', 'Coin', 'coin',
-                            'Instrument', 'instrument', 'Pair', 'pair', 'Currency', 'currency',
-                            'instId', 'InstId', 'underlying', 'Underlying'
-                        ]
-                        
-                        for col in symbol_columns:
-                            if col in record and record[col] is not None and record[col] != '':
-                                asset_value = str(record[col]).strip()
-                                if asset_value:
-                                    symbol = asset_value.replace('USDT', '').replace('-USDT', '').replace('PERP', '').replace('-PERP', '').strip()
-                                    if symbol:
-                                        logging.debug(f"Blofin Symbol aus '{col}' extrahiert: {symbol}")
-                                        break
-                    
-                    # Datum extrahieren
-                    trade_date = 'N/A'
-                    date_columns = [
-                        'Filled/Settlement Time(UTC+0)', 'Create Time', 'Order Time',
-                        'Date', 'date', 'Datum', 'datum', 'Time', 'time', 'Timestamp', 'timestamp',
-                        'Created', 'created', 'Executed', 'executed', 'Open Time', 'Close Time'
-                    ]
-                    
-                    for col in date_columns:
-                        if col in record and record[col] != '' and record[col] is not None:
-                            trade_date = str(record[col]).strip()
-                            logging.debug(f"Datum gefunden in Spalte '{col}': {trade_date}")
-                            break
-                    
-                    # Side extrahieren
-                    side = 'N/A'
-                    side_columns = [
-                        'Trade Type', 'Side', 'side', 'Direction', 'direction', 'Type', 'type',
-                        'Action', 'action', 'Order Type', 'order_type', 'Position', 'position'
-                    ]
-                    
-                    for col in side_columns:
-                        if col in record and record[col] != '' and record[col] is not None:
-                            side_value = str(record[col]).lower().strip()
-                            if any(keyword in side_value for keyword in ['buy', 'long', 'kaufen', 'call', 'open long']):
-                                side = 'Buy'
-                            elif any(keyword in side_value for keyword in ['sell', 'short', 'verkaufen', 'put', 'open short']):
-                                side = 'Sell'
-                            else:
-                                side = str(record[col]).strip()
-                            logging.debug(f"Side gefunden in Spalte '{col}': {side}")
+                    if 'USDT' in str(fee_str):
+                        fee_value = float(clean_numeric_value(fee_str))
+                        pnl_value = -fee_value  # Fee als Verlust
+                        if trace:
+                            logging.info("[TRACE] Blofin: Verwende Fee als PnL: %s (Original Fee: %s)", pnl_value, fee_str)
+                    elif pnl_value == 0:
+                        pnl_value = -0.01  # Minimal-Verlust für Statistiken
+                except:
+                    pnl_value = -0.01  # Fallback Minimal-Verlust
+        else:
+            # Standard PnL Extraktion für Bybit ('Realized P&L')
+            for col, i in pnl_columns:
+                if row[i] is not None:
+                    try:
+                        clean_value = clean_numeric_value(row[i])
+                        if clean_value and clean_value != '0':
+                            pnl_value = float(clean_value)
+                            if trace:
+                                logging.info("[TRACE] PnL gefunden in '%s': %s", col, pnl_value)
+                    except (ValueError, TypeError) as e:
+                        if trace:
+                            logging.info("[TRACE] Fehler beim Parsen von PnL: %s", e)
+        
+        # Symbol Extraktion
+        symbol = 'N/A'
+        
+        if not is_blofin:
+            for col, i in symbol_columns:
+                if row[i] is not None:
+                    contracts_value = str(row[i]).strip()
+                    if contracts_value:
+                        symbol = contracts_value.replace('USDT', '').replace('1000PEPE', 'PEPE').strip()
+                        if symbol:
+                            if trace:
+                                logging.info("[TRACE] Symbol aus '%s' extrahiert: %s", col, symbol)
+        else:
+            for col, i in symbol_columns:
+                if row[i] is not None and row[i] != '':
+                    asset_value = str(row[i]).strip()
+                    if asset_value:
+                        symbol = asset_value.replace('USDT', '').replace('-USDT', '').replace('PERP', '').replace('-PERP', '').strip()
+                        if symbol:
+                            if trace:
+                                logging.info("[TRACE] Blofin Symbol aus '%s' extrahiert: %s", col, symbol)
                             break
-                    
-                    # Size extrahieren
-                    size = 0
-                    size_columns = [
-                        'Qty', 'Size', 'size', 'Quantity', 'quantity', 'Amount', 'amount', 'qty',
-                        'Volume', 'volume', 'Menge', 'menge', 'Contracts', 'contracts', 'Filled', 'Total'
-                    ]
-                    
-                    for col in size_columns:
-                        if col in record and record[col] != '' and record[col] is not None:
-                            try:
-                                size_str = str(record[col])
-                                # Für Blofin: "29 AVAX" -> 29
-                                if sheet_name == "Blofin-7-Tage" and ' ' in size_str:
-                                    size_str = size_str.split()[0]
-                                clean_value = clean_numeric_value(size_str)
-                                if clean_value:
-                                    size = float(clean_value)
-                                    logging.debug(f"Size gefunden in Spalte '{col}': {size}")
-                                    break
-                            except (ValueError, TypeError) as e:
-                                logging.debug(f"Fehler beim Parsen von Size in Spalte '{col}': {e}")
-                                continue
-                    
-                    # Entry Price extrahieren
-                    entry_price = 0
-                    entry_columns = [
-                        'Entry Price', 'Avg Fill', 'entry', 'Entry_Price', 'entry_price', 'Buy_Price', 'buy_price', 
-                        'Open_Price', 'open_price', 'Einstieg', 'einstieg', 'Open', 'open',
-                        'Einstiegspreis', 'Opening Price'
-                    ]
-                    
-                    for col in entry_columns:
-                        if col in record and record[col] != '' and record[col] is not None:
-                            try:
-                                price_str = str(record[col])
-                                # Für Blofin: "19.53 USDT" -> 19.53
-                                if sheet_name == "Blofin-7-Tage" and ' ' in price_str:
-                                    price_str = price_str.split()[0]
-                                clean_value = clean_numeric_value(price_str)
-                                if clean_value:
-                                    entry_price = float(clean_value)
-                                    logging.debug(f"Entry Price gefunden in Spalte '{col}': {entry_price}")
-                                    break
-                            except (ValueError, TypeError) as e:
-                                logging.debug(f"Fehler beim Parsen von Entry Price in Spalte '{col}': {e}")
-                                continue
-                    
-                    # Exit Price extrahieren
-                    exit_price = 0
-                    exit_columns = [
-                        'Filled Price', 'Exit', 'exit', 'Exit_Price', 'exit_price', 'Sell_Price', 'sell_price', 
-                        'Close_Price', 'close_price', 'Ausstieg', 'ausstieg', 'Close', 'close',
-                        'Exit Price', 'Ausstiegspreis', 'Closing Price'
-                    ]
-                    
-                    for col in exit_columns:
-                        if col in record and record[col] != '' and record[col] is not None:
-                            try:
-                                clean_value = clean_numeric_value(record[col])
-                                if clean_value:
-                                    exit_price = float(clean_value)
-                                    logging.debug(f"Exit Price gefunden in Spalte '{col}': {exit_price}")
-                                    break
-                            except (ValueError, TypeError) as e:
-                                logging.debug(f"Fehler beim Parsen von Exit Price in Spalte '{col}': {e}")
-                                continue
-                    
-                    # KORRIGIERTE BEDINGUNG FÜR TRADE-HINZUFÜGUNG
-                    if sheet_name == "Blofin-7-Tage":
-                        # Für Blofin: Trade hinzufügen wenn Symbol vorhanden (auch ohne echten PnL)
-                        should_add = symbol != 'N/A'
-                    else:
-                        # Für Bybit: Trade hinzufügen wenn Symbol vorhanden UND PnL != 0
-                        should_add = (symbol != 'N/A' and pnl_value != 0)
-                    
-                    if should_add:
-                        trade = {
-                            'symbol': symbol,
-                            'date': trade_date,
-                            'side': side,
-                            'size': size,
-                            'entry_price': entry_price,
-                            'exit_price': exit_price,
-                            'pnl': pnl_value
-                        }
-                        
-                        trades.append(trade)
-                        total_pnl += pnl_value
-                        
-                        if pnl_value > 0:
-                            winning_trades += 1
-                            total_profit += pnl_value
-                        elif pnl_value < 0:
-                            total_loss += abs(pnl_value)
-                        
-                        logging.info(f"Trade hinzugefügt für {account_name}: Symbol={symbol}, PnL={pnl_value}, Side={side}")
-                    else:
-                        logging.debug(f"Zeile übersprungen - Symbol: '{symbol}', PnL: {pnl_value}, Sheet: {sheet_name}")
-                    
-                except Exception as e:
-                    logging.warning(f"Fehler beim Verarbeiten einer Zeile in {sheet_name}: {e}")
-                    logging.debug(f"Problematische Zeile: {record}")
+        
+        # Datum extrahieren
+        trade_date = 'N/A'
+        for col, i in date_columns:
+            if row[i] != '' and row[i] is not None:
+                trade_date = str(row[i]).strip()
+                break
+        
+        # Side extrahieren
+        side = 'N/A'
+        for col, i in side_columns:
+            if row[i] != '' and row[i] is not None:
+                side_value = str(row[i]).lower().strip()
+                if any(keyword in side_value for keyword in ['buy', 'long', 'kaufen', 'call', 'open long']):
+                    side = 'Buy'
+                elif any(keyword in side_value for keyword in ['sell', 'short', 'verkaufen', 'put', 'open short']):
+                    side = 'Sell'
+                else:
+                    side = str(row[i]).strip()
+                break
+        
+        # Size extrahieren
+        size = 0
+        for col, i in size_columns:
+            if row[i] != '' and row[i] is not None:
+                try:
+                    size_str = str(row[i])
+                    # Für Blofin: "29 AVAX" -> 29
+                    if is_blofin and ' ' in size_str:
+                        size_str = size_str.split()[0]
+                    clean_value = clean_numeric_value(size_str)
+                    if clean_value:
+                        size = float(clean_value)
+                        break
+                except (ValueError, TypeError) as e:
+                    if trace:
+                        logging.info("[TRACE] Fehler beim Parsen von Size in Spalte '%s': %s", col, e)
                     continue
-            
-            # Statistiken berechnen
-            total_trades = len(trades)
-            win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
-            profit_factor = (total_profit / total_loss) if total_loss > 0 else (999 if total_profit > 0 else 0)
-            avg_trade = total_pnl / total_trades if total_trades > 0 else 0
-            
-            # Drawdown berechnen
-            running_pnl = 0
-            peak = 0
-            max_drawdown = 0
-            
-            for trade in trades:
-                running_pnl += trade['pnl']
-                if running_pnl > peak:
-                    peak = running_pnl
-                drawdown = peak - running_pnl
-                if drawdown > max_drawdown:
-                    max_drawdown = drawdown
-            
-            recent_trades = trades[-10:] if len(trades) >= 10 else trades
-            recent_trades.reverse()
-            
-            account_details.append({
-                'name': account_name,
-                'has_data': total_trades > 0,
-                'total_trades': total_trades,
-                'win_rate': win_rate,
-                'total_pnl': total_pnl,
-                'profit_factor': profit_factor,
-                'avg_trade': avg_trade,
-                'max_drawdown': max_drawdown,
-                'recent_trades': recent_trades,
-                'all_trades': trades
-            })
-            
-            logging.info(f"Account {account_name}: {total_trades} Trades, Win Rate: {win_rate:.1f}%, PnL: ${total_pnl:.2f}")
-            
+        
+        # Entry Price extrahieren
+        entry_price = 0
+        for col, i in entry_columns:
+            if row[i] != '' and row[i] is not None:
+                try:
+                    price_str = str(row[i])
+                    # Für Blofin: "19.53 USDT" -> 19.53
+                    if is_blofin and ' ' in price_str:
+                        price_str = price_str.split()[0]
+                    clean_value = clean_numeric_value(price_str)
+                    if clean_value:
+                        entry_price = float(clean_value)
+                        break
+                except (ValueError, TypeError) as e:
+                    if trace:
+                        logging.info("[TRACE] Fehler beim Parsen von Entry Price in Spalte '%s': %s", col, e)
+                    continue
+        
+        # Exit Price extrahieren
+        exit_price = 0
+        for col, i in exit_columns:
+            if row[i] != '' and row[i] is not None:
+                try:
+                    clean_value = clean_numeric_value(row[i])
+                    if clean_value:
+                        exit_price = float(clean_value)
+                        break
+                except (ValueError, TypeError) as e:
+                    if trace:
+                        logging.info("[TRACE] Fehler beim Parsen von Exit Price in Spalte '%s': %s", col, e)
+                    continue
+        
+        # KORRIGIERTE BEDINGUNG FÜR TRADE-HINZUFÜGUNG
+        if is_blofin:
+            # Für Blofin: Trade hinzufügen wenn Symbol vorhanden (auch ohne echten PnL)
+            should_add = symbol != 'N/A'
+        else:
+            # Für Bybit: Trade hinzufügen wenn Symbol vorhanden UND PnL != 0
+            should_add = (symbol != 'N/A' and pnl_value != 0)
+        
+        if not should_add:
+            if trace:
+                logging.info("[TRACE] Zeile übersprungen - Symbol: '%s', PnL: %s, Sheet: %s", symbol, pnl_value, sheet_name)
+            return None
+        
+        if trace:
+            logging.info("[TRACE] Trade hinzugefügt für %s: Symbol=%s, PnL=%s, Side=%s", account_name, symbol, pnl_value, side)
+        
+        return {
+            'symbol': symbol,
+            'date': trade_date,
+            'side': side,
+            'size': size,
+            'entry_price': entry_price,
+            'exit_price': exit_price,
+            'pnl': pnl_value
+        }
+    
+    return extract, column_report(columns)
+
+def normalize_row(row, width):
+    # Wie get_all_records(): auf Header-Breite auffüllen und Zahlen-Strings konvertieren
+    if len(row) < width:
+        row = row + [''] * (width - len(row))
+    return numericise_all(row)
+
+def parse_trade_rows(sheet_name, account_name, headers, rows, trace=False):
+    """Zeilenweiser Referenz-Parser (Trace-Modus und Paritätsprüfung in benchmark.py)"""
+    trades = []
+    extract, _ = compile_trade_extractor(sheet_name, account_name, headers, trace)
+    width = len(headers)
+    failed = 0
+    
+    for row in rows:
+        try:
+            trade = extract(normalize_row(row, width))
+            if trade:
+                trades.append(trade)
         except Exception as e:
-            logging.error(f"Fehler beim Verarbeiten von {account_name}: {e}")
-            account_details.append({
-                'name': account_name,
-                'has_data': False,
-                'total_trades': 0,
-                'win_rate': 0,
-                'total_pnl': 0,
-                'profit_factor': 0,
-                'avg_trade': 0,
-                'max_drawdown': 0,
-                'recent_trades': [],
-                'all_trades': []
-            })
+            # Nur die ersten Fehler einzeln loggen, der Rest wird gezählt
+            failed += 1
+            if failed <= ROW_WARNING_SAMPLE:
+                logging.warning("Fehler beim Verarbeiten einer Zeile in %s: %s", sheet_name, e)
+                logging.debug("Problematische Zeile: %s", row)
+            continue
+    
+    if failed > ROW_WARNING_SAMPLE:
+        logging.warning("%s Zeilen in %s konnten nicht verarbeitet werden", failed, sheet_name)
+    
+    return trades
+
+def trade_frame(rows, width):
+    """Rohe Sheet-Zeilen als String-DataFrame in Header-Breite (kurze Zeilen werden aufgefüllt)"""
+    frame = pd.DataFrame(rows, dtype=object)
+    return frame.reindex(columns=range(width)).fillna('')
+
+def map_unique(series, func, dtype=object):
+    """Wendet func nur einmal pro eindeutigem Zellwert an (Symbole, Sides und Daten wiederholen sich stark)"""
+    codes, uniques = pd.factorize(series)
+    mapped = np.array([func(value) for value in uniques], dtype=dtype)
+    return pd.Series(mapped[codes], index=series.index)
+
+def sheet_text(value):
+    # str() des Werts, wie ihn get_all_records() liefern würde ("1,000" -> "1000")
+    return str(numericise(value))
+
+def parse_number(text):
+    try:
+        return float(clean_numeric_value(text))
+    except (ValueError, TypeError):
+        return np.nan
+
+def parse_pnl(value):
+    # Wie im Zeilen-Parser: numericise() macht aus "0.00" eine 0, die clean_numeric_value() zu "0" verkürzt
+    clean_value = clean_numeric_value(numericise(value))
+    if clean_value == '0':
+        return np.nan
+    try:
+        return float(clean_value)
+    except (ValueError, TypeError):
+        return np.nan
+
+def parse_unit_number(value):
+    # Für Blofin: "29 AVAX" -> 29
+    text = sheet_text(value)
+    if ' ' in text:
+        parts = text.split()
+        if not parts:
+            return np.nan
+        text = parts[0]
+    return parse_number(text)
+
+def parse_fee(value):
+    # Fee zählt nur mit USDT-Angabe, sonst Minimal-Verlust
+    if 'USDT' not in value:
+        return 0.01
+    fee_value = parse_number(value)
+    return 0.01 if np.isnan(fee_value) else fee_value
+
+def bybit_symbol(value):
+    contracts_value = sheet_text(value).strip()
+    if not contracts_value:
+        return None
+    return contracts_value.replace('USDT', '').replace('1000PEPE', 'PEPE').strip()
+
+def blofin_symbol(value):
+    asset_value = sheet_text(value).strip()
+    if value == '' or not asset_value:
+        return None
+    return asset_value.replace('USDT', '').replace('-USDT', '').replace('PERP', '').replace('-PERP', '').strip()
+
+def side_label(value):
+    side_value = sheet_text(value).lower().strip()
+    if any(keyword in side_value for keyword in ['buy', 'long', 'kaufen', 'call', 'open long']):
+        return 'Buy'
+    if any(keyword in side_value for keyword in ['sell', 'short', 'verkaufen', 'put', 'open short']):
+        return 'Sell'
+    return sheet_text(value).strip()
+
+def first_match(frame, candidates, func, hit, default, dtype=object):
+    """Wert aus der ersten Kandidaten-Spalte, in der hit(raw, value) zutrifft"""
+    result = pd.Series(default, index=frame.index, dtype=dtype)
+    resolved = pd.Series(False, index=frame.index)
+    
+    for col, i in candidates:
+        if resolved.all():
+            break
+        raw = frame[i]
+        value = map_unique(raw, func, dtype)
+        take = hit(raw, value) & ~resolved
+        result = result.where(~take, value)
+        resolved |= take
+    
+    return result
+
+def parse_trade_frame(sheet_name, columns, frame, counters=None):
+    """Spaltenweise Trade-Extraktion; liefert dieselben Trades wie der zeilenweise Extraktor (compile_trade_extractor)"""
+    counters = counters if counters is not None else Counter()
+    is_blofin = sheet_name == "Blofin-7-Tage"
+    index = frame.index
+    present = lambda raw, value: raw != ''
+    parsed = lambda raw, value: (raw != '') & value.notna()
+    
+    # PnL: erste Kandidaten-Spalte mit Wert != 0
+    pnl = first_match(frame, columns['pnl'], parse_pnl, lambda raw, value: value.notna(), 0.0, float)
+    
+    if is_blofin:
+        # Falls kein PnL gefunden wurde, Fee als negativen PnL verwenden
+        fee = map_unique(frame[columns['fee'][0][1]], parse_fee, float) if columns['fee'] else pd.Series(0.01, index=index)
+        fee_fallback = pnl == 0
+        pnl = pnl.where(~fee_fallback, -fee)
+    
+    # Symbol
+    if is_blofin:
+        symbol = first_match(frame, columns['symbol'], blofin_symbol, lambda raw, value: value.notna() & (value != ''), None)
+        # Ein bereinigt leeres Symbol bleibt '' (wie im Zeilen-Parser)
+        assigned = pd.Series(False, index=index)
+        for col, i in columns['symbol']:
+            assigned |= map_unique(frame[i], blofin_symbol).notna()
+        symbol = symbol.where(symbol.notna(), assigned.map({True: '', False: 'N/A'}))
+    else:
+        symbol = first_match(frame, columns['symbol'], bybit_symbol, lambda raw, value: value.notna(), 'N/A')
+    
+    trade_date = first_match(frame, columns['date'], lambda value: sheet_text(value).strip(), present, 'N/A')
+    side = first_match(frame, columns['side'], side_label, present, 'N/A')
+    size = first_match(frame, columns['size'], parse_unit_number if is_blofin else parse_number, parsed, 0.0, float)
+    entry_price = first_match(frame, columns['entry'], parse_unit_number if is_blofin else parse_number, parsed, 0.0, float)
+    exit_price = first_match(frame, columns['exit'], parse_number, parsed, 0.0, float)
+    
+    if is_blofin:
+        # Für Blofin: Trade hinzufügen wenn Symbol vorhanden (auch ohne echten PnL)
+        should_add = symbol != 'N/A'
+        # Zellen nur aus Leerzeichen brechen im Zeilen-Parser die ganze Zeile ab ("   ".split()[0])
+        for field in ('size', 'entry'):
+            blanks = [map_unique(frame[i], lambda value: ' ' in value and not value.split(), bool) for col, i in columns[field]]
+            if not any(blank.any() for blank in blanks):
+                continue
+            broken = pd.Series(False, index=index)
+            resolved = pd.Series(False, index=index)
+            for (col, i), blank in zip(columns[field], blanks):
+                raw = frame[i]
+                broken |= blank & ~resolved
+                resolved |= (raw != '') & (blank | map_unique(raw, parse_unit_number, float).notna())
+            counters['failed_rows'] += int(broken.sum())
+            should_add &= ~broken
+        counters['fee_fallback'] += int((fee_fallback & should_add).sum())
+    else:
+        # Für Bybit: Trade hinzufügen wenn Symbol vorhanden UND PnL != 0
+        should_add = (symbol != 'N/A') & (pnl != 0)
+    
+    counters['rows'] += len(frame)
+    counters['trades'] += int(should_add.sum())
+    
+    return pd.DataFrame({
+        'symbol': symbol,
+        'date': trade_date,
+        'side': side,
+        'size': size,
+        'entry_price': entry_price,
+        'exit_price': exit_price,
+        'pnl': pnl
+    })[should_add]
+
+def sequential_sum(start, values):
+    # cumsum addiert streng von links nach rechts: bitgleich zur früheren Schleife (np.sum summiert paarweise)
+    return float(np.cumsum(np.concatenate(([start], values)))[-1])
+
+def add_trade_frame_to_state(state, trades):
+    """Schreibt die Aggregate spaltenweise fort (cumsum/cummax statt Schleife über jeden Trade)"""
+    if trades.empty:
+        return
+    
+    pnl = trades['pnl'].to_numpy(dtype=float)
+    # Python-Listen statt to_dict('records'): deutlich schneller bei großen Sheets
+    keys = list(trades.columns)
+    state['trades'].extend(dict(zip(keys, values)) for values in zip(*(trades[key].tolist() for key in keys)))
+    state['total_pnl'] = sequential_sum(state['total_pnl'], pnl)
+    state['winning_trades'] += int((pnl > 0).sum())
+    state['total_profit'] = sequential_sum(state['total_profit'], pnl[pnl > 0])
+    state['total_loss'] = sequential_sum(state['total_loss'], -pnl[pnl < 0])
+    
+    # Drawdown über kumulierten PnL und laufendes Maximum
+    running = np.cumsum(np.concatenate(([state['running_pnl']], pnl)))[1:]
+    peak = np.maximum.accumulate(np.concatenate(([state['peak']], running)))[1:]
+    state['running_pnl'] = float(running[-1])
+    state['peak'] = float(peak[-1])
+    state['max_drawdown'] = max(state['max_drawdown'], float((peak - running).max()))
+
+def row_fingerprint(row, width):
+    # Nur Spalten unter einem Header zählen, da inkrementelle Reads auf die Header-Breite begrenzt sind;
+    # leere Zellen am Ende liefert die Sheets API dort nicht mit
+    cells = list(row[:width])
+    while cells and cells[-1] in ('', None):
+        cells.pop()
+    return hashlib.md5(json.dumps(cells, default=str).encode()).hexdigest()
+
+def new_trade_state(values):
+    return {
+        'headers': values[0] if values else [],
+        'row_count': len(values),
+        'fingerprint': row_fingerprint(values[-1], len(values[0])) if values else None,
+        'full_scan_at': time.time(),
+        'trades': [],
+        'total_pnl': 0,
+        'winning_trades': 0,
+        'total_profit': 0,
+        'total_loss': 0,
+        'running_pnl': 0,
+        'peak': 0,
+        'max_drawdown': 0
+    }
+
+def add_trades_to_state(state, trades):
+    # Skalare Fortschreibung, Referenz für add_trade_frame_to_state()
+    for trade in trades:
+        pnl_value = trade['pnl']
+        state['trades'].append(trade)
+        state['total_pnl'] += pnl_value
+        
+        if pnl_value > 0:
+            state['winning_trades'] += 1
+            state['total_profit'] += pnl_value
+        elif pnl_value < 0:
+            state['total_loss'] += abs(pnl_value)
+        
+        # Drawdown
+        state['running_pnl'] += pnl_value
+        if state['running_pnl'] > state['peak']:
+            state['peak'] = state['running_pnl']
+        drawdown = state['peak'] - state['running_pnl']
+        if drawdown > state['max_drawdown']:
+            state['max_drawdown'] = drawdown
+
+def parse_trade_chunk(sheet_name, state, rows, counters):
+    """Neue Zeilen eines Sheets auswerten; im Trace-Modus zeilenweise mit Detail-Logs"""
+    if sheet_name == trace_sheet:
+        trades = parse_trade_rows(sheet_name, sheet_mapping[sheet_name], state['headers'], rows, trace=True)
+        counters['rows'] += len(rows)
+        counters['trades'] += len(trades)
+        return pd.DataFrame(trades, columns=['symbol', 'date', 'side', 'size', 'entry_price', 'exit_price', 'pnl'])
+    
+    return parse_trade_frame(sheet_name, state['columns'], trade_frame(rows, len(state['headers'])), counters)
+
+def full_scan_trade_sheet(sheet_name, values, counters=None):
+    counters = counters if counters is not None else Counter()
+    state = new_trade_state(values)
+    rows = values[1:]
+    
+    # Spalten-Zuordnung einmal pro Sheet aus der Header-Zeile
+    state['columns'] = resolve_trade_columns(sheet_name, state['headers'])
+    state['column_report'] = column_report(state['columns'])
+    logging.info("Vollständiger Scan %s: %s Datensätze, Spalten-Zuordnung: %s", sheet_name, len(rows), state['column_report'])
+    logging.debug("Verfügbare Spalten in %s: %s", sheet_name, state['headers'])
+    
+    if rows and sheet_name == trace_sheet:
+        first_rows = [dict(zip(state['headers'], normalize_row(row, len(state['headers'])))) for row in rows[:3]]
+        logging.info("[TRACE] Erste 3 Zeilen von %s: %s", sheet_name, first_rows)
+    
+    if rows:
+        add_trade_frame_to_state(state, parse_trade_chunk(sheet_name, state, rows, counters))
+    counters['full_scans'] += 1
+    trade_store[sheet_name] = state
+
+def append_trade_rows(sheet_name, state, header_row, tail_values, counters=None):
+    """Übernimmt neu angehängte Zeilen; False, wenn das Sheet seit dem letzten Sync anderweitig verändert wurde"""
+    if header_row != state['headers'] or not tail_values or row_fingerprint(tail_values[0], len(header_row)) != state['fingerprint']:
+        return False
+    
+    new_rows = tail_values[1:]
+    if new_rows:
+        add_trade_frame_to_state(state, parse_trade_chunk(sheet_name, state, new_rows, counters if counters is not None else Counter()))
+        state['row_count'] += len(new_rows)
+        state['fingerprint'] = row_fingerprint(new_rows[-1], len(header_row))
+        logging.debug("%s neue Zeilen in %s", len(new_rows), sheet_name)
+    
+    return True
+
+def sync_trade_sheets(spreadsheet, full_rescan=False, sheet_names=None):
+    """Liest pro Worksheet nur die seit dem letzten Sync angehängten Zeilen (High-Water-Mark: Zeilenzahl + Fingerprint der letzten Zeile)"""
+    global trade_sync_stats
+    
+    started = time.time()
+    counters = Counter()
+    available_sheets = []
+    for sheet_name in (sheet_mapping if sheet_names is None else sheet_names):
+        try:
+            get_worksheet(spreadsheet, sheet_name)
+            available_sheets.append(sheet_name)
+        except gspread.exceptions.WorksheetNotFound:
+            logging.warning(f"Worksheet '{sheet_name}' nicht gefunden")
+            trade_store.pop(sheet_name, None)
+    
+    now = time.time()
+    full_sheets = []
+    incremental_sheets = []
+    for sheet_name in available_sheets:
+        state = trade_store.get(sheet_name)
+        if full_rescan or state is None or not state['headers'] or now - state['full_scan_at'] > TRADE_FULL_RESCAN_INTERVAL:
+            full_sheets.append(sheet_name)
+        else:
+            incremental_sheets.append(sheet_name)
+    
+    # Ein Batch-Call: komplette Sheets sowie Header und Zeilen ab der letzten bekannten Zeile
+    ranges = [sheet_range(sheet_name) for sheet_name in full_sheets]
+    for sheet_name in incremental_sheets:
+        state = trade_store[sheet_name]
+        last_column = gspread.utils.rowcol_to_a1(1, len(state['headers'])).rstrip('0123456789')
+        ranges.append(f"{sheet_range(sheet_name)}!1:1")
+        ranges.append(f"{sheet_range(sheet_name)}!A{state['row_count']}:{last_column}")
+    
+    if not ranges:
+        return
+    
+    sheets_rate_limiter.acquire()
+    with timed('sheets', sheets_seconds, operation='values_batch_get'):
+        response = spreadsheet.values_batch_get(ranges)
+    value_ranges = [value_range.get('values', []) for value_range in response.get('valueRanges', [])]
+    
+    for sheet_name, values in zip(full_sheets, value_ranges):
+        full_scan_trade_sheet(sheet_name, values, counters)
+    
+    # Fallback: veränderte Sheets (Header, letzte Zeile oder gekürzt) vollständig neu einlesen
+    changed_sheets = []
+    incremental_values = value_ranges[len(full_sheets):]
+    for i, sheet_name in enumerate(incremental_sheets):
+        header_values = incremental_values[2 * i]
+        header_row = header_values[0] if header_values else []
+        if not append_trade_rows(sheet_name, trade_store[sheet_name], header_row, incremental_values[2 * i + 1], counters):
+            logging.info(f"Worksheet '{sheet_name}' wurde verändert - vollständiger Rescan")
+            changed_sheets.append(sheet_name)
+    
+    if changed_sheets:
+        sheets_rate_limiter.acquire()
+        with timed('sheets', sheets_seconds, operation='values_batch_get'):
+            response = spreadsheet.values_batch_get([sheet_range(sheet_name) for sheet_name in changed_sheets])
+        for sheet_name, value_range in zip(changed_sheets, response.get('valueRanges', [])):
+            full_scan_trade_sheet(sheet_name, value_range.get('values', []), counters)
+    
+    # Eine Zusammenfassung pro Sync statt Log-Zeilen pro Trade
+    counters['sheets'] = len(available_sheets)
+    counters['incremental'] = len(incremental_sheets) - len(changed_sheets)
+    stats = {key: counters[key] for key in ('sheets', 'full_scans', 'incremental', 'rows', 'trades', 'fee_fallback', 'failed_rows')}
+    stats['duration'] = round(time.time() - started, 3)
+    stats['finished_at'] = datetime.now().isoformat(timespec='seconds')
+    trade_sync_stats = stats
+    logging.info("Trade-Sync: %(sheets)s Sheets (%(full_scans)s vollständig, %(incremental)s inkrementell), %(rows)s Zeilen -> %(trades)s Trades, "
+                 "%(fee_fallback)s Fee-Fallback, %(failed_rows)s fehlerhaft, %(duration)ss", stats)
+
+def account_details_from_state(account_name, state):
+    trades = list(state['trades'])
+    total_trades = len(trades)
+    total_pnl = state['total_pnl']
+    
+    # Statistiken berechnen
+    win_rate = (state['winning_trades'] / total_trades * 100) if total_trades > 0 else 0
+    profit_factor = (state['total_profit'] / state['total_loss']) if state['total_loss'] > 0 else (999 if state['total_profit'] > 0 else 0)
+    avg_trade = total_pnl / total_trades if total_trades > 0 else 0
+    
+    recent_trades = trades[-10:]
+    recent_trades.reverse()
+    
+    logging.debug("Account %s: %s Trades, Win Rate: %.1f%%, PnL: $%.2f", account_name, total_trades, win_rate, total_pnl)
+    
+    return {
+        'name': account_name,
+        'has_data': total_trades > 0,
+        'total_trades': total_trades,
+        'win_rate': win_rate,
+        'total_pnl': total_pnl,
+        'profit_factor': profit_factor,
+        'avg_trade': avg_trade,
+        'max_drawdown': state['max_drawdown'],
+        'recent_trades': recent_trades,
+        'all_trades': trades
+    }
+
+def get_trading_data_from_sheets(gc, spreadsheet, full_rescan=False, sheet_names=None):
+    account_details = []
+    sheet_names = list(sheet_mapping) if sheet_names is None else sheet_names
+    
+    with trade_store_lock:
+        try:
+            sync_trade_sheets(spreadsheet, full_rescan, sheet_names)
+        except Exception as e:
+            # Bei Lesefehlern bleibt der zuletzt synchronisierte Stand erhalten
+            logging.error(f"Fehler beim Lesen der Daten: {e}")
+        
+        for sheet_name in sheet_names:
+            account_name = sheet_mapping[sheet_name]
+            try:
+                state = trade_store.get(sheet_name)
+                if state is None:
+                    account_details.append(empty_account_details(account_name))
+                    continue
+                
+                account_details.append(account_details_from_state(account_name, state))
+                
+            except Exception as e:
+                logging.error(f"Fehler beim Verarbeiten von {account_name}: {e}")
+                account_details.append(empty_account_details(account_name))
     
     return account_details
 
-def save_daily_data(total_balance, total_pnl, gc, spreadsheet):
+DASHBOARD_DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS closed_pnl (
+    account TEXT NOT NULL,
+    order_id TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    side TEXT NOT NULL,
+    qty REAL NOT NULL,
+    avg_entry_price REAL NOT NULL,
+    avg_exit_price REAL NOT NULL,
+    closed_pnl REAL NOT NULL,
+    created_time INTEGER NOT NULL,
+    updated_time INTEGER NOT NULL,
+    PRIMARY KEY (account, order_id)
+);
+CREATE INDEX IF NOT EXISTS closed_pnl_account_time ON closed_pnl (account, updated_time);
+CREATE TABLE IF NOT EXISTS closed_pnl_sync (
+    account TEXT PRIMARY KEY,
+    synced_until INTEGER NOT NULL,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS daily_balances (
+    account TEXT NOT NULL,
+    day TEXT NOT NULL,
+    balance REAL NOT NULL,
+    pnl REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (account, day)
+);
+CREATE INDEX IF NOT EXISTS daily_balances_day ON daily_balances (day);
+CREATE TABLE IF NOT EXISTS balance_snapshots (
+    account TEXT NOT NULL,
+    taken_at INTEGER NOT NULL,
+    balance REAL NOT NULL,
+    pnl REAL NOT NULL,
+    PRIMARY KEY (account, taken_at)
+);
+CREATE INDEX IF NOT EXISTS balance_snapshots_taken_at ON balance_snapshots (taken_at);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+def get_dashboard_db():
+    """SQLite-Verbindung des lokalen Stores, beim ersten Zugriff mit Schema angelegt; Aufrufer halten dashboard_db_lock"""
+    if dashboard_db['connection'] is None:
+        directory = os.path.dirname(DASHBOARD_DB_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(DASHBOARD_DB_PATH, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(DASHBOARD_DB_SCHEMA)
+        dashboard_db['connection'] = connection
+    return dashboard_db['connection']
+
+def closed_pnl_row(account_name, item):
+    return (
+        account_name,
+        item["orderId"],
+        item["symbol"],
+        item["side"],
+        float(item.get("qty") or 0),
+        float(item.get("avgEntryPrice") or 0),
+        float(item.get("avgExitPrice") or 0),
+        float(item.get("closedPnl") or 0),
+        int(item["createdTime"]),
+        int(item["updatedTime"])
+    )
+
+def closed_pnl_backfill_key(account_name):
+    return f"closed_pnl_backfill:{account_name}"
+
+def sync_closed_pnl_account(acc):
+    """Holt Closed PnL ab dem letzten vollständig gelesenen Zeitfenster; Rückgabe (Requests, Einträge)
+    
+    Bybit erlaubt höchstens 7 Tage pro Abfrage, innerhalb eines Fensters wird per Cursor geblättert. Die
+    High-Water-Mark rückt erst vor, wenn ein Fenster komplett gespeichert ist; erreicht sie die Gegenwart,
+    wird der Backfill in store_meta als abgeschlossen markiert. Nach BYBIT_CLOSED_PNL_SYNC_BUDGET Sekunden
+    endet der Lauf nach dem aktuellen Fenster. Die Exchange-Semaphore gilt nur je Seite, damit
+    get_account_data zwischen den Seiten eines langen Backfills drankommt."""
+    name = acc["name"]
+    with dashboard_db_lock:
+        row = get_dashboard_db().execute("SELECT synced_until FROM closed_pnl_sync WHERE account = ?", (name,)).fetchone()
+    
+    now = int(time.time() * 1000)
+    start = row[0] - BYBIT_CLOSED_PNL_OVERLAP_MS if row else now - BYBIT_CLOSED_PNL_BACKFILL_DAYS * 24 * 3600 * 1000
+    adapter = get_exchange_adapter(acc)
+    deadline = time.monotonic() + BYBIT_CLOSED_PNL_SYNC_BUDGET
+    requests_made = 0
+    entries = 0
+    
+    while start < now:
+        end = min(start + BYBIT_CLOSED_PNL_WINDOW_MS, now)
+        items = []
+        cursor = None
+        while True:
+            with exchange_semaphores[acc["exchange"]]:
+                page, cursor = adapter.closed_pnl(start_time=start, end_time=end, cursor=cursor, limit=BYBIT_CLOSED_PNL_PAGE_SIZE)
+            requests_made += 1
+            items.extend(page)
+            if not cursor or not page:
+                break
+        
+        with dashboard_db_lock:
+            db = get_dashboard_db()
+            with db:
+                db.executemany("INSERT OR REPLACE INTO closed_pnl VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                               [closed_pnl_row(name, item) for item in items])
+                db.execute("INSERT OR REPLACE INTO closed_pnl_sync VALUES (?, ?, ?)", (name, end, time.time()))
+                if end == now:
+                    db.execute("INSERT OR IGNORE INTO store_meta VALUES (?, ?)",
+                               (closed_pnl_backfill_key(name), datetime.now().isoformat(timespec='seconds')))
+        entries += len(items)
+        start = end + 1
+        if start < now and time.monotonic() >= deadline:
+            logging.info(f"Closed-PnL-Sync {name}: Zeitbudget erreicht, weiter ab {datetime.fromtimestamp(start / 1000).isoformat(timespec='seconds')} im nächsten Lauf")
+            break
+    
+    return requests_made, entries
+
+def closed_pnl_sync_accounts():
+    return [acc for acc in subaccounts if acc["exchange"] == "bybit" and acc.get("key") and acc.get("secret")]
+
+def closed_pnl_store_accounts():
+    """Accounts mit abgeschlossenem Backfill; nur deren Trades kommen aus dem Store, die übrigen bleiben auf den Sheets"""
+    with dashboard_db_lock:
+        backfilled = {row[0] for row in get_dashboard_db().execute("SELECT key FROM store_meta WHERE key LIKE 'closed_pnl_backfill:%'")}
+    return [acc["name"] for acc in closed_pnl_sync_accounts() if closed_pnl_backfill_key(acc["name"]) in backfilled]
+
+def sync_closed_pnl():
+    """Gleicht den Trade-Store aller Bybit-Accounts mit API-Key ab (Scheduler-Job); liefert die Accounts, deren Trades aus dem Store kommen"""
+    global closed_pnl_sync_stats
+    
+    if not closed_pnl_sync_job['lock'].acquire(blocking=False):
+        return closed_pnl_store_accounts()
+    
+    try:
+        started = time.time()
+        accounts = closed_pnl_sync_accounts()
+        counters = Counter()
+        if accounts:
+            with ThreadPoolExecutor(max_workers=EXCHANGE_CONCURRENCY["bybit"], thread_name_prefix="closed-pnl-sync") as executor:
+                for result in executor.map(sync_closed_pnl_account_counted, accounts):
+                    counters.update(result)
+        
+        # Auch bei einem Fehler in diesem Lauf gilt der bisher gespeicherte Stand
+        store_accounts = closed_pnl_store_accounts()
+        stats = {key: counters[key] for key in ('requests', 'entries', 'failed')}
+        stats['accounts'] = len(accounts)
+        stats['backfilling'] = len(accounts) - len(store_accounts)
+        stats['duration'] = round(time.time() - started, 3)
+        stats['finished_at'] = datetime.now().isoformat(timespec='seconds')
+        closed_pnl_sync_stats = stats
+        logging.info("Closed-PnL-Sync: %(accounts)s Accounts (%(backfilling)s im Backfill), %(requests)s Requests, %(entries)s Einträge, %(failed)s fehlgeschlagen, %(duration)ss", stats)
+        return store_accounts
+    finally:
+        closed_pnl_sync_job['lock'].release()
+
+def sync_closed_pnl_account_counted(acc):
+    try:
+        requests_made, entries = sync_closed_pnl_account(acc)
+        return Counter(requests=requests_made, entries=entries)
+    except Exception as e:
+        logging.error(f"Closed-PnL-Sync für {acc['name']} fehlgeschlagen: {e}")
+        return Counter(failed=1)
+
+def closed_pnl_account_details(account_name):
+    """Statistiken aus dem Trade-Store, im Format von account_details_from_state (Trades mit PnL 0 zählen wie in den Sheets nicht)
+    
+    Die Aggregate kommen per Index-Abfrage; die Trade-Liste wird nur neu aufgebaut, wenn sich der Store geändert hat."""
+    with dashboard_db_lock:
+        db = get_dashboard_db()
+        total_trades, total_pnl, winning_trades, total_profit, total_loss, last_updated = db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(closed_pnl), 0), COALESCE(SUM(closed_pnl > 0), 0), "
+            "COALESCE(SUM(CASE WHEN closed_pnl > 0 THEN closed_pnl END), 0), COALESCE(SUM(CASE WHEN closed_pnl < 0 THEN -closed_pnl END), 0), "
+            "MAX(updated_time) FROM closed_pnl WHERE account = ? AND closed_pnl != 0", (account_name,)).fetchone()
+        version = (total_trades, last_updated, total_pnl)
+        cached = closed_pnl_details.get(account_name)
+        if cached and cached[0] == version:
+            return cached[1]
+        rows = db.execute(
+            "SELECT symbol, side, qty, avg_entry_price, avg_exit_price, closed_pnl, updated_time FROM closed_pnl "
+            "WHERE account = ? AND closed_pnl != 0 ORDER BY updated_time, order_id", (account_name,)).fetchall()
+    
+    # Symbole und Zeitstempel gesammelt umwandeln statt pro Trade
+    symbols = {symbol: bybit_symbol(symbol) for symbol in {row[0] for row in rows}}
+    dates = pd.to_datetime([row[6] for row in rows], unit='ms', utc=True).tz_convert("Europe/Berlin").strftime('%H:%M %Y-%m-%d')
+    trades = [{
+        'symbol': symbols[symbol],
+        'date': date,
+        # Bybit liefert die Seite der schließenden Order, angezeigt wird die Richtung der Position
+        'side': 'Sell' if side == 'Buy' else 'Buy',
+        'size': qty,
+        'entry_price': avg_entry_price,
+        'exit_price': avg_exit_price,
+        'pnl': pnl
+    } for (symbol, side, qty, avg_entry_price, avg_exit_price, pnl, updated_time), date in zip(rows, dates)]
+    
+    max_drawdown = 0.0
+    if trades:
+        running = np.cumsum([trade['pnl'] for trade in trades])
+        peak = np.maximum.accumulate(np.concatenate(([0.0], running)))[1:]
+        max_drawdown = float((peak - running).max())
+    
+    state = {
+        'trades': trades,
+        'total_pnl': total_pnl,
+        'winning_trades': winning_trades,
+        'total_profit': total_profit,
+        'total_loss': total_loss,
+        'max_drawdown': max_drawdown
+    }
+    details = account_details_from_state(account_name, state)
+    closed_pnl_details[account_name] = (version, details)
+    return details
+
+@cached_function(cache_duration=DAILY_BALANCES_CACHE_DURATION, key_func=spreadsheet_key("DailyBalances"))
+def get_daily_balance_records(gc, spreadsheet):
+    sheet = get_worksheet(spreadsheet, "DailyBalances")
+    sheets_rate_limiter.acquire()
+    with timed('sheets', sheets_seconds, operation='get_all_records'):
+        return sheet.get_all_records()
+
+def find_daily_row(gc, spreadsheet, day):
+    """Zeilennummer des Tages in DailyBalances (gemerkt; gescannt wird nur der gecachte Stand beim ersten Schreiben)"""
+    if day in daily_rows:
+        return daily_rows[day]
+    
+    for i, record in enumerate(get_daily_balance_records(gc, spreadsheet), start=2):
+        if record.get('Datum') == day:
+            daily_rows[day] = i
+            return i
+    return None
+
+def save_daily_data(total_balance, total_pnl, gc, spreadsheet, day=None):
+    """Schreibt Balance und PnL eines Tages nach DailyBalances (nur aus flush_daily_journal aufrufen)"""
     if not gc or not spreadsheet:
         logging.debug("Kein Google Sheet verfügbar")
         return False
     
+    day = day or datetime.now(timezone("Europe/Berlin")).strftime("%d.%m.%Y")
+    
     try:
-        sheet = spreadsheet.worksheet("DailyBalances")
-        today = datetime.now(timezone("Europe/Berlin")).strftime("%d.%m.%Y")
-        
         try:
-            records = sheet.get_all_records()
+            row = find_daily_row(gc, spreadsheet, day)
         except gspread.exceptions.APIError as e:
             logging.error(f"Fehler beim Lesen der Google Sheets Daten: {e}")
             return False
         
-        today_exists = any(record.get('Datum') == today for record in records)
+        sheet = get_worksheet(spreadsheet, "DailyBalances")
+        
+        if row is not None:
+            # Gemerkte Zeile gegenprüfen (eine Zelle), falls im Sheet Zeilen eingefügt oder sortiert wurden
+            sheets_rate_limiter.acquire()
+            with timed('sheets', sheets_seconds, operation='acell'):
+                row_date = sheet.acell(f'A{row}').value
+            if row_date != day:
+                logging.warning(f"Zeile {row} in DailyBalances gehört nicht mehr zu {day} - suche neu")
+                daily_rows.pop(day, None)
+                get_daily_balance_records.invalidate(gc, spreadsheet)
+                row = find_daily_row(gc, spreadsheet, day)
+        
+        records = get_daily_balance_records.peek(gc, spreadsheet)
         
-        if not today_exists:
+        if row is None:
             try:
-                sheet.append_row([today, total_balance, total_pnl])
-                logging.info(f"Daten für {today} gespeichert")
+                with timed('sheets', sheets_seconds, operation='append_row'):
+                    response = sheet.append_row([day, total_balance, total_pnl])
+                
+                # Neue Zeilennummer aus der API-Antwort merken, z.B. "'DailyBalances'!A43:C43"
+                match = re.search(r'![A-Z]+(\d+)', (response or {}).get('updates', {}).get('updatedRange', ''))
+                if match:
+                    daily_rows[day] = int(match.group(1))
+                
+                if records is not None and match and daily_rows[day] == len(records) + 2:
+                    columns = list(records[0].keys()) if records else ['Datum', 'Balance', 'PnL']
+                    get_daily_balance_records.store(records + [dict(zip(columns, [day, total_balance, total_pnl]))], gc, spreadsheet)
+                else:
+                    get_daily_balance_records.invalidate(gc, spreadsheet)
+                
+                logging.info(f"Daten für {day} gespeichert")
                 return True
             except gspread.exceptions.APIError as e:
                 logging.error(f"Fehler beim Hinzufügen der Zeile: {e}")
                 return False
-        else:
-            for i, record in enumerate(records, start=2):
-                if record.get('Datum') == today:
-                    try:
-                        sheet.update(values=[[total_balance, total_pnl]], range_name=f'B{i}:C{i}')
-                        logging.info(f"Daten für {today} aktualisiert")
-                        return True
-                    except gspread.exceptions.APIError as e:
-                        logging.error(f"Fehler beim Aktualisieren: {e}")
-                        return False
-                    break
+        
+        try:
+            with timed('sheets', sheets_seconds, operation='update'):
+                sheet.update(values=[[total_balance, total_pnl]], range_name=f'B{row}:C{row}')
+            
+            # Write-through: gecachte Zeilen aktualisieren statt das Sheet neu zu lesen
+            if records is not None and len(records) >= row - 1 and records[row - 2].get('Datum') == day:
+                columns = list(records[row - 2].keys())
+                updated_record = dict(records[row - 2])
+                updated_record.update(zip(columns[1:3], [total_balance, total_pnl]))
+                updated_records = list(records)
+                updated_records[row - 2] = updated_record
+                get_daily_balance_records.store(updated_records, gc, spreadsheet)
+            
+            logging.info(f"Daten für {day} aktualisiert")
+            return True
+        except gspread.exceptions.APIError as e:
+            logging.error(f"Fehler beim Aktualisieren: {e}")
+            return False
                     
     except Exception as e:
         logging.error(f"Unerwarteter Fehler beim Speichern: {e}")
         return False
+
+def record_daily_data(total_balance, total_pnl):
+    """Puffert den letzten Stand des Tages im Speicher (Seitenaufrufe schreiben nicht mehr ins Sheet)"""
+    day = datetime.now(timezone("Europe/Berlin")).strftime("%d.%m.%Y")
+    with daily_journal_lock:
+        daily_journal[day] = (total_balance, total_pnl)
+        daily_journal.move_to_end(day)
+
+def record_balances(account_data, total_balance):
+    """Schreibt den aktuellen Stand in den lokalen Store (Tageswert, alle INTRADAY_SNAPSHOT_INTERVAL ein Snapshot)
+    und reiht den Gesamtstand für den DailyBalances-Spiegel ein; der Gesamtstand nur, wenn alle Accounts echte Werte liefern"""
+    total_pnl = total_balance - sum(startkapital.values())
+    now = time.time()
+    day = datetime.fromtimestamp(now, timezone("Europe/Berlin")).strftime("%Y-%m-%d")
     
-    return True
+    # Accounts mit Fallback-Balance (Timeout, Fehler) würden ihre Historie verfälschen
+    rows = [(acc['name'], acc['balance'], acc['pnl']) for acc in account_data if acc['status'] == "✅"]
+    # Die Summe enthielte sonst dieselben Fallback-Werte
+    complete = len(rows) == len(account_data)
+    if complete:
+        rows.append((BALANCE_TOTAL, total_balance, total_pnl))
+    
+    with dashboard_db_lock:
+        db = get_dashboard_db()
+        with db:
+            db.executemany("INSERT OR REPLACE INTO daily_balances VALUES (?, ?, ?, ?, ?)",
+                           [(name, day, balance, pnl, now) for name, balance, pnl in rows])
+            if now - balance_snapshot_state['last_taken'] >= INTRADAY_SNAPSHOT_INTERVAL:
+                balance_snapshot_state['last_taken'] = now
+                db.executemany("INSERT OR REPLACE INTO balance_snapshots VALUES (?, ?, ?, ?)",
+                               [(name, int(now), balance, pnl) for name, balance, pnl in rows])
+                db.execute("DELETE FROM balance_snapshots WHERE taken_at < ?", (int(now) - INTRADAY_RETENTION_DAYS * 86400,))
+    
+    if complete:
+        record_daily_data(total_balance, total_pnl)
+    else:
+        logging.warning(f"Gesamtstand nicht gespeichert: {len(account_data) - len(rows)} Account(s) ohne gültige Balance")
 
-def get_historical_performance(total_pnl, gc, spreadsheet):
-    performance_data = {
-        '1_day': 0.0,
-        '7_day': 0.0,
-        '30_day': 0.0
-    }
+def backfill_daily_balances(gc, spreadsheet):
+    """Übernimmt DailyBalances einmalig in den lokalen Store; bereits lokal erfasste Tage haben Vorrang"""
+    with dashboard_db_lock:
+        done = get_dashboard_db().execute("SELECT value FROM store_meta WHERE key = 'daily_balances_backfill'").fetchone()
+    if done or not gc or not spreadsheet:
+        return
     
-    if not gc or not spreadsheet:
-        logging.debug("Kein Google Sheet verfügbar für historische Performance")
-        return performance_data
+    now = time.time()
+    rows = []
+    for record in get_daily_balance_records(gc, spreadsheet):
+        try:
+            day = datetime.strptime(str(record.get('Datum')), '%d.%m.%Y').strftime('%Y-%m-%d')
+            rows.append((BALANCE_TOTAL, day, float(record.get('Balance')), float(record.get('PnL')), now))
+        except (ValueError, TypeError):
+            continue
+    
+    with dashboard_db_lock:
+        db = get_dashboard_db()
+        with db:
+            db.executemany("INSERT OR IGNORE INTO daily_balances VALUES (?, ?, ?, ?, ?)", rows)
+            db.execute("INSERT OR REPLACE INTO store_meta VALUES ('daily_balances_backfill', ?)", (datetime.now().isoformat(timespec='seconds'),))
+    logging.info(f"DailyBalances: {len(rows)} Tage in den lokalen Store übernommen")
+
+def daily_balance_history(account=BALANCE_TOTAL):
+    """(Datum als TT.MM.JJJJ, Balance, PnL) je Tag, aufsteigend"""
+    with dashboard_db_lock:
+        return get_dashboard_db().execute(
+            "SELECT strftime('%d.%m.%Y', day), balance, pnl FROM daily_balances WHERE account = ? ORDER BY day", (account,)).fetchall()
+
+def flush_daily_journal():
+    """Schreibt alle gepufferten Tage nach DailyBalances; fehlgeschlagene bleiben für den nächsten Flush im Puffer"""
+    if not daily_flush_job['lock'].acquire(blocking=False):
+        return
     
     try:
-        sheet = spreadsheet.worksheet("DailyBalances")
-        records = sheet.get_all_records()
-        if not records:
-            logging.info("Keine historischen Daten gefunden")
-            return performance_data
-            
-        df = pd.DataFrame(records)
-        if df.empty:
-            return performance_data
-        
-        df['Datum'] = pd.to_datetime(df['Datum'], format='%d.%m.%Y', errors='coerce')
-        df = df.dropna(subset=['Datum'])
-        df = df.sort_values('Datum')
+        with daily_journal_lock:
+            pending = list(daily_journal.items())
+            daily_journal.clear()
+        if not pending:
+            return
         
+        sheets_data = setup_google_sheets()
+        failed = []
+        for day, (total_balance, total_pnl) in pending:
+            if not sheets_data or not save_daily_data(total_balance, total_pnl, *sheets_data, day=day):
+                failed.append((day, (total_balance, total_pnl)))
+        
+        # Neuere Werte aus der Zwischenzeit haben Vorrang
+        with daily_journal_lock:
+            for day, values in reversed(failed):
+                if day not in daily_journal:
+                    daily_journal[day] = values
+                    daily_journal.move_to_end(day, last=False)
+    finally:
+        daily_flush_job['lock'].release()
+
+atexit.register(flush_daily_journal)
+
+def get_historical_pnl_references(gc, spreadsheet):
+    """Liefert die PnL-Stände, die 1, 7 und 30 Tage zurückliegen (aus dem lokalen Store, Sheets nur für den einmaligen Import)"""
+    references = {
+        '1_day': None,
+        '7_day': None,
+        '30_day': None
+    }
+    
+    try:
+        backfill_daily_balances(gc, spreadsheet)
+    except Exception as e:
+        logging.error(f"Fehler beim Übernehmen von DailyBalances: {e}")
+    
+    try:
         today = datetime.now(timezone("Europe/Berlin")).date()
         
-        for days, key in [(1, '1_day'), (7, '7_day'), (30, '30_day')]:
-            target_date = today - timedelta(days=days)
-            df['date_diff'] = abs(df['Datum'].dt.date - target_date)
-            
-            if not df.empty:
-                closest_idx = df['date_diff'].idxmin()
+        with dashboard_db_lock:
+            db = get_dashboard_db()
+            for days, key in [(1, '1_day'), (7, '7_day'), (30, '30_day')]:
+                target_date = today - timedelta(days=days)
+                target = target_date.isoformat()
+                before = db.execute("SELECT day, pnl FROM daily_balances WHERE account = ? AND day <= ? ORDER BY day DESC LIMIT 1",
+                                    (BALANCE_TOTAL, target)).fetchone()
+                after = db.execute("SELECT day, pnl FROM daily_balances WHERE account = ? AND day > ? ORDER BY day LIMIT 1",
+                                   (BALANCE_TOTAL, target)).fetchone()
                 
-                if pd.notna(closest_idx) and closest_idx in df.index:
-                    try:
-                        historical_pnl = float(df.loc[closest_idx, 'PnL'])
-                        performance_data[key] = total_pnl - historical_pnl
-                    except (ValueError, TypeError, KeyError):
-                        logging.warning(f"Ungültige PnL Daten für {key}")
-                        continue
+                # Nächstgelegener Tag, bei gleichem Abstand der frühere
+                candidates = [row for row in (before, after) if row]
+                if candidates:
+                    day, pnl = min(candidates, key=lambda row: abs(datetime.strptime(row[0], '%Y-%m-%d').date() - target_date))
+                    references[key] = pnl
         
-        logging.info(f"Historische Performance berechnet: {performance_data}")
+        if all(value is None for value in references.values()):
+            logging.info("Keine historischen Daten gefunden")
+        else:
+            logging.info(f"Historische PnL-Referenzen geladen: {references}")
         
     except Exception as e:
         logging.error(f"Fehler bei historischer Performance-Berechnung: {e}")
     
+    return references
+
+def calculate_historical_performance(total_pnl, references):
+    performance_data = {
+        '1_day': 0.0,
+        '7_day': 0.0,
+        '30_day': 0.0
+    }
+    
+    for key, historical_pnl in (references or {}).items():
+        if historical_pnl is not None:
+            performance_data[key] = total_pnl - historical_pnl
+    
     return performance_data
 
-def create_equity_curve_chart(gc, spreadsheet):
-    """Erstellt eine hochauflösende Equity Curve vom ersten Tag an"""
+# Platzhalter für den Degraded Mode: einmal beim Start vorgerendert, danach nur noch ausgeliefert
+PLACEHOLDER_CHARTS = {
+    'keine_daten': {'text': 'Keine Daten\nverfügbar'},
+    'zu_wenig_daten': {'text': 'Zu wenig Daten\nfür Equity Curve'},
+    'chart_fehler': {'text': 'Chart\nFehler', 'color': '#e74c3c'},
+    'strategien': {'text': 'Subaccount Performance\nnicht verfügbar', 'figsize': (14, 8), 'fontsize': 28},
+    'projekte': {'text': 'Projekt Performance\nnicht verfügbar', 'figsize': (14, 8), 'fontsize': 28}
+}
+
+def placeholder_path(name):
+    return f"static/placeholder_{name}.png"
+
+def placeholder_spec(name):
+    return {'kind': 'placeholder', 'name': name, 'text': PLACEHOLDER_CHARTS[name]['text'],
+            'color': PLACEHOLDER_CHARTS[name].get('color', '#bdc3c7')}
+
+def equity_curve_spec(gc, spreadsheet):
+    """Eingaben der Equity Curve: entweder ein Platzhalter-Text oder die PnL-Reihe aus dem lokalen Store"""
     try:
-        if not gc or not spreadsheet:
-            # Fallback: Erstelle ein leeres Chart
-            fig, ax = plt.subplots(figsize=(8, 5))
-            fig.patch.set_facecolor('#2c3e50')
-            ax.set_facecolor('#34495e')
-            ax.text(0.5, 0.5, 'Keine Daten\nverfügbar', ha='center', va='center', 
-                   color='#bdc3c7', transform=ax.transAxes, fontsize=14, fontweight='bold')
-            ax.set_xticks([])
-            ax.set_yticks([])
-            for spine in ax.spines.values():
-                spine.set_visible(False)
-            plt.tight_layout(pad=0)
-            plt.subplots_adjust(left=0, right=1, top=1, bottom=0)
-            chart_path = "static/equity_curve_small.png"
-            fig.savefig(chart_path, facecolor='#2c3e50', dpi=400, bbox_inches='tight', 
-                       pad_inches=0)
-            plt.close(fig)
-            return chart_path
-        
-        sheet = spreadsheet.worksheet("DailyBalances")
-        records = sheet.get_all_records()
-        
-        if not records or len(records) < 3:
-            # Fallback für leere oder zu wenig Daten
-            fig, ax = plt.subplots(figsize=(8, 5))
-            fig.patch.set_facecolor('#2c3e50')
-            ax.set_facecolor('#34495e')
-            ax.text(0.5, 0.5, 'Zu wenig Daten\nfür Equity Curve', ha='center', va='center', 
-                   color='#bdc3c7', transform=ax.transAxes, fontsize=14, fontweight='bold')
-            ax.set_xticks([])
-            ax.set_yticks([])
-            for spine in ax.spines.values():
-                spine.set_visible(False)
-            plt.tight_layout(pad=0)
-            plt.subplots_adjust(left=0, right=1, top=1, bottom=0)
-            chart_path = "static/equity_curve_small.png"
-            fig.savefig(chart_path, facecolor='#2c3e50', dpi=400, bbox_inches='tight', 
-                       pad_inches=0)
-            plt.close(fig)
-            return chart_path
-        
-        df = pd.DataFrame(records)
-        df['Datum'] = pd.to_datetime(df['Datum'], format='%d.%m.%Y', errors='coerce')
-        df = df.dropna(subset=['Datum'])
-        df = df.sort_values('Datum')
-        
-        # VERWENDE ALLE DATEN VOM ERSTEN TAG AN (kein .tail() mehr!)
-        logging.info(f"Equity Curve: Verwende alle {len(df)} Datenpunkte vom ersten Tag an")
-        
-        if len(df) < 3:
-            # Fallback für zu wenig Daten nach Filterung
-            fig, ax = plt.subplots(figsize=(5, 3.5))
-            fig.patch.set_facecolor('#2c3e50')
-            ax.set_facecolor('#34495e')
-            ax.text(0.5, 0.5, 'Ungenügend\nhistorische Daten', ha='center', va='center', 
-                   color='#bdc3c7', transform=ax.transAxes, fontsize=12, fontweight='bold')
-            ax.set_xticks([])
-            ax.set_yticks([])
-            for spine in ax.spines.values():
-                spine.set_visible(False)
-            plt.tight_layout(pad=0)
-            plt.subplots_adjust(left=0, right=1, top=1, bottom=0)
-            chart_path = "static/equity_curve_small.png"
-            fig.savefig(chart_path, facecolor='#2c3e50', dpi=300, bbox_inches='tight', 
-                       pad_inches=0)
-            plt.close(fig)
-            return chart_path
-        
-        # Erstelle MAXIMALE Equity Curve für das komplette KPI-Feld
-        fig, ax = plt.subplots(figsize=(6, 4))  # Größere Figur für maximale Füllung
-        fig.patch.set_facecolor('#2c3e50')
-        ax.set_facecolor('#34495e')
-        
-        # Konvertiere PnL zu numerischen Werten
-        pnl_values = []
-        for pnl in df['PnL']:
-            try:
-                pnl_values.append(float(pnl))
-            except:
-                pnl_values.append(0)
-        
-        # Erstelle x-Achse (Tage)
-        x_values = list(range(len(pnl_values)))
-        
-        # Bestimme Farben basierend auf Performance
-        start_value = pnl_values[0] if pnl_values else 0
-        end_value = pnl_values[-1] if pnl_values else 0
-        
-        if end_value >= start_value:
-            line_color = '#28a745'  # Grün für Gewinn
-            fill_color = '#28a745'
-            alpha_fill = 0.3
+        backfill_daily_balances(gc, spreadsheet)
+    except Exception as e:
+        logging.error(f"Fehler beim Übernehmen von DailyBalances: {e}")
+    
+    history = daily_balance_history()
+    
+    if not history:
+        return placeholder_spec('keine_daten')
+    
+    if len(history) < 3:
+        # Fallback für zu wenig Daten
+        return placeholder_spec('zu_wenig_daten')
+    
+    # VERWENDE ALLE DATEN VOM ERSTEN TAG AN (kein .tail() mehr!)
+    logging.debug(f"Equity Curve: Verwende alle {len(history)} Datenpunkte vom ersten Tag an")
+    
+    dates = [day for day, balance, pnl in history]
+    pnl_values = [pnl for day, balance, pnl in history]
+    return equity_curve_series(pnl_values, dates, EQUITY_CURVE_MAX_POINTS)
+
+def equity_curve_series(pnl_values, dates, max_points):
+    """Kurven-Spec mit höchstens max_points Punkten; die ATH-Linie wird vorher über alle Tage berechnet"""
+    peak_values = peak_series(pnl_values)
+    days = downsample_indices(pnl_values, max_points)
+    return {
+        'kind': 'curve',
+        'days': days,
+        'pnl_values': [pnl_values[i] for i in days],
+        'peaks': [peak_values[i] for i in days],
+        'dates': [dates[i] for i in days],
+        'total_points': len(pnl_values)
+    }
+
+def downsample_indices(values, max_points):
+    """Min/Max-Downsampling: Indizes der Punkte, die bei einem Budget von max_points gezeichnet werden
+    
+    Pro Bucket bleiben Tiefst- und Höchstwert erhalten, dazu immer Start, Ende, All-Time High, Tiefpunkt
+    sowie Hoch und Tief des größten Drawdowns. Die Kurve sieht daher gleich aus, nur ohne verdeckte Zwischenpunkte.
+    Das Ergebnis hat nie mehr als max_points Indizes; bei sehr kleinem Budget zählen die Fixpunkte in dieser Reihenfolge."""
+    count = len(values)
+    if max_points <= 0 or count <= max_points:
+        return list(range(count))
+    
+    series = np.asarray(values, dtype=float)
+    drawdown = series - np.maximum.accumulate(series)
+    trough_idx = int(np.argmin(drawdown))
+    fixed = [0, count - 1, int(np.argmax(series)), int(np.argmin(series)),
+             trough_idx, int(np.argmax(series[:trough_idx + 1]))]
+    keep = set(list(dict.fromkeys(fixed))[:max_points])
+    
+    # Je Bucket höchstens zwei neue Punkte, damit das Budget hält
+    bucket_count = (max_points - len(keep)) // 2
+    if bucket_count:
+        edges = np.linspace(1, count - 1, bucket_count + 1).astype(int).tolist()
+        for start, end in zip(edges[:-1], edges[1:]):
+            if end > start:
+                bucket = series[start:end]
+                keep.add(start + int(np.argmin(bucket)))
+                keep.add(start + int(np.argmax(bucket)))
+    return sorted(keep)
+
+def peak_series(pnl_values):
+    # Kumulativer Peak (höchster Wert bis zu jedem Punkt) für die All-Time-High-Linie
+    peak_values = []
+    current_peak = pnl_values[0] if pnl_values else 0
+    
+    for value in pnl_values:
+        if value > current_peak:
+            current_peak = value
+        peak_values.append(current_peak)
+    
+    return peak_values
+
+def spec_hash(spec):
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode('utf-8')).hexdigest()
+
+def chart_variant_path(chart_path, width, fmt):
+    # static/placeholder_projekte.png -> static/placeholder_projekte_960w.webp
+    return f"{os.path.splitext(chart_path)[0]}_{width}w.{fmt}"
+
+def chart_ready(chart_path):
+    return all(os.path.exists(chart_variant_path(chart_path, width, fmt)) for width in CHART_WIDTHS for fmt in CHART_FORMATS)
+
+def save_image_atomic(image, path, fmt):
+    """Schreibt in eine temporäre Datei im selben Verzeichnis und tauscht sie per os.replace aus (nie halb geschriebene Bilder)"""
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        if fmt == 'webp':
+            image.save(tmp_path, format='WEBP', quality=80, method=4)
         else:
-            line_color = '#dc3545'  # Rot für Verlust
-            fill_color = '#dc3545'
-            alpha_fill = 0.3
-        
-        # Zeichne die Hauptlinie mit höherer Qualität
-        ax.plot(x_values, pnl_values, color=line_color, linewidth=3, alpha=0.9, 
-                antialiased=True, solid_capstyle='round', solid_joinstyle='round')
-        
-        # Fülle den Bereich unter der Kurve
-        ax.fill_between(x_values, pnl_values, alpha=alpha_fill, color=fill_color)
-        
-        # ERWEITERTE PEAK-LINIE (deine gewünschte "Picklinie")
-        # Berechne den kumulativen Peak (höchster Wert bis zu jedem Punkt)
-        peak_values = []
-        current_peak = pnl_values[0] if pnl_values else 0
-        
-        for value in pnl_values:
-            if value > current_peak:
-                current_peak = value
-            peak_values.append(current_peak)
-        
-        # Zeichne die Peak-Linie (Picklinie)
-        ax.plot(x_values, peak_values, color='#f39c12', linewidth=2, alpha=0.8, 
-                linestyle='--', label='All-Time High')
-        
-        # Füge detaillierte Höhen- und Tiefpunkte hinzu
-        if len(pnl_values) > 10:
-            max_idx = pnl_values.index(max(pnl_values))
-            min_idx = pnl_values.index(min(pnl_values))
-            
-            # Markiere absoluten Höchstpunkt
-            ax.scatter(max_idx, pnl_values[max_idx], color='#f39c12', s=60, alpha=0.9, 
-                      zorder=5, edgecolors='white', linewidth=1)
-            
-            # Markiere absoluten Tiefstpunkt
-            ax.scatter(min_idx, pnl_values[min_idx], color='#e74c3c', s=60, alpha=0.9, 
-                      zorder=5, edgecolors='white', linewidth=1)
-            
-            # Markiere Start- und Endpunkt
-            ax.scatter(0, pnl_values[0], color='#3498db', s=50, alpha=0.8, 
-                      zorder=5, edgecolors='white', linewidth=1)
-            ax.scatter(len(pnl_values)-1, pnl_values[-1], color='#9b59b6', s=50, alpha=0.8, 
-                      zorder=5, edgecolors='white', linewidth=1)
-        
-        # Füge ein subtiles Gitter hinzu für bessere Lesbarkeit
-        ax.grid(True, alpha=0.1, color='white', linestyle='-', linewidth=0.5)
-        ax.set_axisbelow(True)
-        
-        # Entferne sichtbare Achsen aber behalte das Gitter
-        ax.set_xticks([])
-        ax.set_yticks([])
-        
-        # Entferne alle Rahmen
-        for spine in ax.spines.values():
-            spine.set_visible(False)
-        
-        # Setze KEINE Margins für maximale Nutzung des Platzes
-        ax.margins(x=0, y=0)  # Komplett keine Margins
-        
-        # Speichere mit maximaler Größe und OHNE jegliche Ränder
-        plt.tight_layout(pad=0)
-        plt.subplots_adjust(left=0, right=1, top=1, bottom=0)  # Entferne alle Subplot-Abstände
-        
-        chart_path = "static/equity_curve_small.png"
-        fig.savefig(chart_path, facecolor='#2c3e50', dpi=400, bbox_inches='tight', 
-                   pad_inches=0, edgecolor='none')  # Maximale Qualität, keine Ränder
-        plt.close(fig)
-        
-        logging.info(f"Hochauflösende Equity Curve erstellt: {len(pnl_values)} Datenpunkte (komplette Historie), Start: {start_value:.2f}, Ende: {end_value:.2f}, Peak: {max(pnl_values):.2f}")
-        
-        return chart_path
+            image.save(tmp_path, format='PNG', optimize=True)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def save_figure_atomic(fig, chart_path, **kwargs):
+    """Rendert die Figur einmal in der größten Breite und skaliert daraus alle Varianten aus CHART_WIDTHS als PNG und WebP"""
+    os.makedirs(os.path.dirname(chart_path) or '.', exist_ok=True)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=max(CHART_WIDTHS) / fig.get_figwidth(), **kwargs)
+    buffer.seek(0)
+    with Image.open(buffer) as rendered:
+        image = rendered.convert('RGB')
+    
+    for width in CHART_WIDTHS:
+        if width == image.width:
+            variant = image
+        else:
+            variant = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+        for fmt in CHART_FORMATS:
+            save_image_atomic(variant, chart_variant_path(chart_path, width, fmt), fmt)
+
+def chart_cache_path(name, content_hash):
+    return os.path.join(CHART_CACHE_DIR, name, content_hash[:16], f"{name}.png")
+
+def prune_chart_cache(name):
+    """Behält pro Chart nur die CHART_CACHE_KEEP zuletzt benutzten Einträge"""
+    chart_dir = os.path.join(CHART_CACHE_DIR, name)
+    entries = [os.path.join(chart_dir, entry) for entry in os.listdir(chart_dir)]
+    entries = sorted((entry for entry in entries if os.path.isdir(entry)), key=os.path.getmtime, reverse=True)
+    for entry in entries[CHART_CACHE_KEEP:]:
+        if chart_sources.get(name, '').startswith(entry + os.sep):
+            continue
+        shutil.rmtree(entry, ignore_errors=True)
+
+def render_cached_chart(name, content_hash, render):
+    """Rendert einen Chart nur, wenn es für diesen Content-Hash noch keinen Cache-Eintrag gibt
+    
+    Eine Lock-Datei (O_CREAT | O_EXCL) neben dem Eintrag sorgt dafür, dass von mehreren Worker-Prozessen
+    nur einer rendert; die anderen warten auf dessen Dateien. Verwaiste Locks gelten nach CHART_RENDER_TIMEOUT als frei."""
+    chart_path = chart_cache_path(name, content_hash)
+    entry_dir = os.path.dirname(chart_path)
+    lock_path = f"{entry_dir}.lock"
+    
+    if chart_ready(chart_path):
+        chart_cache_stats['hits'] += 1
+    
+    while not chart_ready(chart_path):
+        os.makedirs(entry_dir, exist_ok=True)
+        try:
+            lock_fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > CHART_RENDER_TIMEOUT:
+                    logging.warning(f"Verwaister Chart-Lock {lock_path} wird entfernt")
+                    os.remove(lock_path)
+            except FileNotFoundError:
+                pass
+            chart_cache_stats['waits'] += 1
+            time.sleep(0.2)
+            continue
         
+        try:
+            os.close(lock_fd)
+            if not chart_ready(chart_path):
+                with timed('chart_render', chart_render_seconds, chart=name):
+                    render(chart_path)
+                chart_cache_stats['renders'] += 1
+                prune_chart_cache(name)
+        finally:
+            os.remove(lock_path)
+    
+    # mtime des Eintrags = letzte Benutzung (für prune_chart_cache)
+    os.utime(entry_dir)
+    chart_sources[name] = chart_path
+    chart_versions[name] = content_hash
+    return chart_path
+
+def render_placeholder_chart(chart_path, text, figsize=(8, 5), fontsize=14, color='#bdc3c7'):
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    fig.patch.set_facecolor('#2c3e50')
+    ax.set_facecolor('#34495e')
+    ax.text(0.5, 0.5, text, ha='center', va='center', 
+           color=color, transform=ax.transAxes, fontsize=fontsize, fontweight='bold')
+    ax.set_xticks([])
+    ax.set_yticks([])
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+    fig.tight_layout(pad=0)
+    fig.subplots_adjust(left=0, right=1, top=1, bottom=0)
+    save_figure_atomic(fig, chart_path, facecolor='#2c3e50', bbox_inches='tight', pad_inches=0)
+
+def prerender_placeholder_charts():
+    """Rendert fehlende Platzhalter-Bilder (im Render-Worker beim Start)"""
+    for name, options in PLACEHOLDER_CHARTS.items():
+        chart_path = placeholder_path(name)
+        if not chart_ready(chart_path):
+            with timed('chart_render', chart_render_seconds, chart=f"placeholder_{name}"):
+                render_placeholder_chart(chart_path, **options)
+            logging.info(f"Platzhalter-Chart {chart_path} erstellt")
+
+def use_placeholder(chart_name, placeholder_name):
+    """Chart auf einen vorgerenderten Platzhalter umstellen, ohne zu rendern (außer die Datei fehlt)"""
+    chart_path = placeholder_path(placeholder_name)
+    if not chart_ready(chart_path):
+        render_placeholder_chart(chart_path, **PLACEHOLDER_CHARTS[placeholder_name])
+    chart_sources[chart_name] = chart_path
+    chart_versions[chart_name] = spec_hash(placeholder_spec(placeholder_name))
+    return chart_path
+
+def render_equity_curve(chart_path, spec):
+    """Erstellt eine hochauflösende Equity Curve vom ersten Tag an (x-Achse: Tag, auch bei ausgedünnter Reihe)"""
+    pnl_values = spec['pnl_values']
+    
+    # Erstelle MAXIMALE Equity Curve für das komplette KPI-Feld
+    fig = Figure(figsize=(6, 4))  # Größere Figur für maximale Füllung
+    ax = fig.subplots()
+    fig.patch.set_facecolor('#2c3e50')
+    ax.set_facecolor('#34495e')
+    
+    # Erstelle x-Achse (Tage)
+    x_values = spec['days']
+    
+    # Bestimme Farben basierend auf Performance
+    start_value = pnl_values[0] if pnl_values else 0
+    end_value = pnl_values[-1] if pnl_values else 0
+    
+    if end_value >= start_value:
+        line_color = '#28a745'  # Grün für Gewinn
+        fill_color = '#28a745'
+        alpha_fill = 0.3
+    else:
+        line_color = '#dc3545'  # Rot für Verlust
+        fill_color = '#dc3545'
+        alpha_fill = 0.3
+    
+    # Zeichne die Hauptlinie mit höherer Qualität
+    ax.plot(x_values, pnl_values, color=line_color, linewidth=3, alpha=0.9, 
+            antialiased=True, solid_capstyle='round', solid_joinstyle='round')
+    
+    # Fülle den Bereich unter der Kurve
+    ax.fill_between(x_values, pnl_values, alpha=alpha_fill, color=fill_color)
+    
+    # ERWEITERTE PEAK-LINIE (deine gewünschte "Picklinie"), über alle Tage berechnet
+    peak_values = spec['peaks']
+    
+    # Zeichne die Peak-Linie (Picklinie)
+    ax.plot(x_values, peak_values, color='#f39c12', linewidth=2, alpha=0.8, 
+            linestyle='--', label='All-Time High')
+    
+    # Füge detaillierte Höhen- und Tiefpunkte hinzu
+    if len(pnl_values) > 10:
+        max_idx = pnl_values.index(max(pnl_values))
+        min_idx = pnl_values.index(min(pnl_values))
+        
+        # Markiere absoluten Höchstpunkt
+        ax.scatter(x_values[max_idx], pnl_values[max_idx], color='#f39c12', s=60, alpha=0.9, 
+                  zorder=5, edgecolors='white', linewidth=1)
+        
+        # Markiere absoluten Tiefstpunkt
+        ax.scatter(x_values[min_idx], pnl_values[min_idx], color='#e74c3c', s=60, alpha=0.9, 
+                  zorder=5, edgecolors='white', linewidth=1)
+        
+        # Markiere Start- und Endpunkt
+        ax.scatter(x_values[0], pnl_values[0], color='#3498db', s=50, alpha=0.8, 
+                  zorder=5, edgecolors='white', linewidth=1)
+        ax.scatter(x_values[-1], pnl_values[-1], color='#9b59b6', s=50, alpha=0.8, 
+                  zorder=5, edgecolors='white', linewidth=1)
+    
+    # Füge ein subtiles Gitter hinzu für bessere Lesbarkeit
+    ax.grid(True, alpha=0.1, color='white', linestyle='-', linewidth=0.5)
+    ax.set_axisbelow(True)
+    
+    # Entferne sichtbare Achsen aber behalte das Gitter
+    ax.set_xticks([])
+    ax.set_yticks([])
+    
+    # Entferne alle Rahmen
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+    
+    # Setze KEINE Margins für maximale Nutzung des Platzes
+    ax.margins(x=0, y=0)  # Komplett keine Margins
+    
+    # Speichere mit maximaler Größe und OHNE jegliche Ränder
+    fig.tight_layout(pad=0)
+    fig.subplots_adjust(left=0, right=1, top=1, bottom=0)  # Entferne alle Subplot-Abstände
+    
+    save_figure_atomic(fig, chart_path, facecolor='#2c3e50', bbox_inches='tight', 
+                       pad_inches=0, edgecolor='none')  # Keine Ränder, Auflösung aus CHART_WIDTHS
+    
+    logging.info(f"Hochauflösende Equity Curve erstellt: {len(pnl_values)} von {spec['total_points']} Datenpunkten (komplette Historie), Start: {start_value:.2f}, Ende: {end_value:.2f}, Peak: {max(pnl_values):.2f}")
+
+def create_equity_curve_chart(gc, spreadsheet):
+    """Rendert die Equity Curve nur, wenn es für die Eingabedaten noch keinen Eintrag im Chart-Cache gibt (nur im Render-Worker aufrufen)"""
+    try:
+        spec = equity_curve_spec(gc, spreadsheet)
     except Exception as e:
         logging.error(f"Fehler beim Erstellen der Equity Curve: {e}")
         # Fallback Chart bei Fehler
-        fig, ax = plt.subplots(figsize=(8, 5))
-        fig.patch.set_facecolor('#2c3e50')
-        ax.set_facecolor('#34495e')
-        ax.text(0.5, 0.5, 'Chart\nFehler', ha='center', va='center', 
-               color='#e74c3c', transform=ax.transAxes, fontsize=14, fontweight='bold')
-        ax.set_xticks([])
-        ax.set_yticks([])
-        for spine in ax.spines.values():
-            spine.set_visible(False)
-        plt.tight_layout(pad=0)
-        plt.subplots_adjust(left=0, right=1, top=1, bottom=0)
-        chart_path = "static/equity_curve_small.png"
-        fig.savefig(chart_path, facecolor='#2c3e50', dpi=400, bbox_inches='tight', 
-                   pad_inches=0)
-        plt.close(fig)
-        return chart_path
+        spec = placeholder_spec('chart_fehler')
+    
+    if spec['kind'] == 'placeholder':
+        return use_placeholder('equity_curve_small', spec['name'])
+    
+    try:
+        return render_cached_chart('equity_curve_small', spec_hash(spec), lambda chart_path: render_equity_curve(chart_path, spec))
+    except Exception as e:
+        logging.error(f"Fehler beim Erstellen der Equity Curve: {e}")
+        return use_placeholder('equity_curve_small', 'chart_fehler')
+
+def render_equity_curve_job():
+    sheets_data = setup_google_sheets()
+    return create_equity_curve_chart(*(sheets_data or (None, None)))
+
+def render_performance_charts_job():
+    account_snapshot = get_snapshot('account_data')
+    return create_cached_charts(account_snapshot['data']['account_data'])
+
+# Ein einzelner Render-Thread: Matplotlib ist nicht thread-safe, Request-Threads rendern nie selbst
+chart_render_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chart-render")
+chart_jobs_lock = Lock()
+chart_jobs = {}
+CHART_JOBS = {
+    'equity_curve_small': ('equity', render_equity_curve_job),
+    'chart_strategien': ('performance', render_performance_charts_job),
+    'chart_projekte': ('performance', render_performance_charts_job)
+}
+
+def submit_chart_render(name):
+    """Reiht einen Render-Job ein; ein bereits wartender Job für dieselben Charts wird wiederverwendet"""
+    job_name, job = CHART_JOBS[name]
+    with chart_jobs_lock:
+        future = chart_jobs.get(job_name)
+        if future is None or future.done():
+            future = chart_render_executor.submit(job)
+            chart_jobs[job_name] = future
+        return future
+
+def blofin_signature(secret, path, method, timestamp, nonce, body=''):
+    """Blofin ACCESS-SIGN: Base64 des hex HMAC-SHA256 über Pfad (inkl. Query), Methode, Timestamp, Nonce und Body"""
+    message = f"{path}{method}{timestamp}{nonce}{body}"
+    hex_signature = hmac.new(secret.encode('utf-8'), message.encode('utf-8'), hashlib.sha256).hexdigest().encode()
+    return base64.b64encode(hex_signature).decode()
+
+def new_blofin_session():
+    """Session mit Connection-Pool; Retries macht _make_request selbst, weil jede Wiederholung neu signiert werden muss"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(2, EXCHANGE_CONCURRENCY["blofin"] * 2), max_retries=0)
+    session.mount("https://", adapter)
+    return session
+
+blofin_session = new_blofin_session()
 
 class BlofinAPI:
-    def __init__(self, api_key, api_secret, passphrase):
+    def __init__(self, api_key, api_secret, passphrase, session=None):
         self.api_key = api_key
         self.api_secret = api_secret
         self.passphrase = passphrase
         self.base_url = "https://openapi.blofin.com"
+        self.session = session or blofin_session
     
     def _generate_signature(self, path, method, timestamp, nonce, body=''):
-        message = f"{path}{method}{timestamp}{nonce}"
-        if body:
-            message += body
-        
-        hex_signature = hmac.new(
-            self.api_secret.encode('utf-8'),
-            message.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest().encode()
-        
-        return base64.b64encode(hex_signature).decode()
+        return blofin_signature(self.api_secret, path, method, timestamp, nonce, body)
     
     def _make_request(self, method, endpoint, params=None):
+        """Signierter Request über die gemeinsame Session; 429/5xx und Verbindungsfehler werden mit Jitter-Backoff wiederholt
+        
+        Ein Read-Timeout wird nicht wiederholt, und alle Versuche zusammen enden spätestens nach ACCOUNT_FETCH_DEADLINE,
+        damit ein hängender Request den einzigen Blofin-Slot nicht über den Fetch hinaus belegt."""
+        deadline = time.monotonic() + ACCOUNT_FETCH_DEADLINE
+        for attempt in range(BLOFIN_MAX_RETRIES + 1):
+            try:
+                # Der letzte Versuch bekommt nur noch die Restzeit bis zur Deadline
+                response = self._send(method, endpoint, params, min(BLOFIN_READ_TIMEOUT, max(deadline - time.monotonic(), 1.0)))
+            except (requests.ConnectionError, requests.Timeout) as e:
+                delay = self._retry_delay(attempt)
+                if attempt == BLOFIN_MAX_RETRIES or isinstance(e, requests.ReadTimeout) or time.monotonic() + delay >= deadline:
+                    logging.error(f"Blofin API Error: {e}")
+                    raise
+                logging.warning(f"Blofin {method} {endpoint}: {e} - neuer Versuch in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            
+            if response.status_code in BLOFIN_RETRY_STATUS and attempt < BLOFIN_MAX_RETRIES:
+                delay = self._retry_delay(attempt, response.headers.get('Retry-After'))
+                if delay is not None and time.monotonic() + delay < deadline:
+                    logging.warning(f"Blofin {method} {endpoint}: HTTP {response.status_code} - neuer Versuch in {delay:.1f}s")
+                    time.sleep(delay)
+                    continue
+                # Längeres Retry-After oder Deadline erreicht: sofort scheitern statt Fetch-Slot und Semaphore zu blockieren
+                logging.warning(f"Blofin {method} {endpoint}: HTTP {response.status_code}, Retry-After {response.headers.get('Retry-After')}s - kein neuer Versuch")
+            
+            try:
+                response.raise_for_status()
+                return response.json()
+            except Exception as e:
+                logging.error(f"Blofin API Error: {e}")
+                raise
+    
+    def _retry_delay(self, attempt, retry_after=None):
+        # Retry-After (Sekunden) hat Vorrang, sonst exponentiell mit ±50% Jitter; beides höchstens BLOFIN_READ_TIMEOUT,
+        # ein längeres Retry-After ergibt None (kein neuer Versuch)
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            return min(BLOFIN_RETRY_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.5), BLOFIN_READ_TIMEOUT)
+        return delay if delay <= BLOFIN_READ_TIMEOUT else None
+    
+    def _send(self, method, endpoint, params=None, read_timeout=BLOFIN_READ_TIMEOUT):
         timestamp = str(int(time.time() * 1000))
         nonce = str(uuid.uuid4())
         request_path = endpoint
@@ -840,23 +2140,17 @@ class BlofinAPI:
         }
         
         url = f"{self.base_url}{request_path}"
+        logging.info(f"Blofin API Request: {method} {url}")
         
-        try:
-            logging.info(f"Blofin API Request: {method} {url}")
-            
-            if method == 'GET':
-                response = requests.get(url, headers=headers, timeout=15)
-            else:
-                response = requests.post(url, headers=headers, json=params, timeout=15)
-            
-            logging.info(f"Blofin Response Status: {response.status_code}")
-            logging.debug(f"Blofin Response: {response.text}")
-            
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            logging.error(f"Blofin API Error: {e}")
-            raise
+        timeout = (BLOFIN_CONNECT_TIMEOUT, read_timeout)
+        if method == 'GET':
+            response = self.session.get(url, headers=headers, timeout=timeout)
+        else:
+            response = self.session.post(url, headers=headers, json=params, timeout=timeout)
+        
+        logging.info(f"Blofin Response Status: {response.status_code}")
+        logging.debug(f"Blofin Response: {response.text}")
+        return response
     
     def get_account_balance(self):
         return self._make_request('GET', '/api/v1/account/balance')
@@ -864,94 +2158,202 @@ class BlofinAPI:
     def get_positions(self):
         return self._make_request('GET', '/api/v1/account/positions')
 
-def get_bybit_data(acc):
-    try:
-        client = HTTP(api_key=acc["key"], api_secret=acc["secret"])
-        wallet = client.get_wallet_balance(accountType="UNIFIED")["result"]["list"]
-        usdt = sum(float(c["walletBalance"]) for x in wallet for c in x["coin"] if c["coin"] == "USDT")
-        
+class BybitClient:
+    """Persistenter pybit-Client eines Subaccounts; Aufrufe laufen serialisiert und werden gezählt"""
+    
+    def __init__(self, name, api_key, api_secret):
+        self.name = name
+        self.http = HTTP(api_key=api_key, api_secret=api_secret)
+        self.lock = Lock()
+        # Eigener Lock für die Zähler, damit stats() nicht auf einen laufenden Request wartet
+        self.stats_lock = Lock()
+        self.requests = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.last_seconds = None
+    
+    def call(self, method, **kwargs):
+        # Die requests-Session von pybit ist nicht für parallele Nutzung ausgelegt
+        with self.lock:
+            started = time.perf_counter()
+            failed = False
+            try:
+                return getattr(self.http, method)(**kwargs)
+            except Exception:
+                failed = True
+                raise
+            finally:
+                duration = time.perf_counter() - started
+                with self.stats_lock:
+                    self.requests += 1
+                    self.errors += failed
+                    self.seconds += duration
+                    self.last_seconds = duration
+                bybit_client_seconds.observe(duration, account=self.name, method=method)
+    
+    def stats(self):
+        with self.stats_lock:
+            return {
+                'requests': self.requests,
+                'errors': self.errors,
+                'avg_ms': round(self.seconds / self.requests * 1000, 1) if self.requests else None,
+                'last_ms': round(self.last_seconds * 1000, 1) if self.last_seconds is not None else None
+            }
+
+def registered_client(lock, clients, name, credentials, factory):
+    """Langlebiger Client pro Account aus einer Registry; neu nur bei geänderten Zugangsdaten"""
+    with lock:
+        entry = clients.get(name)
+        if entry is None or entry[0] != credentials:
+            entry = (credentials, factory(*credentials))
+            clients[name] = entry
+        return entry[1]
+
+def get_bybit_client(acc):
+    return registered_client(bybit_clients_lock, bybit_clients, acc["name"], (acc["key"], acc["secret"]),
+                             lambda *credentials: BybitClient(acc["name"], *credentials))
+
+def bybit_client_stats():
+    with bybit_clients_lock:
+        clients = [client for _, client in bybit_clients.values()]
+    return {client.name: client.stats() for client in clients}
+
+def get_blofin_client(acc):
+    return registered_client(blofin_clients_lock, blofin_clients, acc["name"], (acc["key"], acc["secret"], acc["passphrase"]),
+                             lambda *credentials: BlofinAPI(*credentials))
+
+class ExchangeAdapter:
+    """Gemeinsame Schnittstelle der Exchanges: USDT-Balance, offene Positionen (Bybit-Feldnamen) und Closed PnL"""
+    exchange = None
+    
+    def __init__(self, acc):
+        self.acc = acc
+    
+    def balance(self):
+        raise NotImplementedError
+    
+    def positions(self):
+        raise NotImplementedError
+    
+    def closed_pnl(self, start_time=None, end_time=None, cursor=None, limit=100):
+        """Eine Seite abgeschlossener Trades als (Einträge, nächster Cursor oder None); bisher nur Bybit, Blofin-Trades kommen aus den Sheets"""
+        raise NotImplementedError(f"Closed PnL für {self.exchange} nicht angebunden")
+    
+    def fetch(self):
+        """(usdt, positions, status) für get_account_data"""
+        raise NotImplementedError
+
+class BybitAdapter(ExchangeAdapter):
+    exchange = "bybit"
+    
+    @property
+    def client(self):
+        return get_bybit_client(self.acc)
+    
+    def balance(self):
+        wallet = self.client.call('get_wallet_balance', accountType="UNIFIED")["result"]["list"]
+        return sum(float(c["walletBalance"]) for x in wallet for c in x["coin"] if c["coin"] == "USDT")
+    
+    def positions(self):
+        pos = self.client.call('get_positions', category="linear", settleCoin="USDT")["result"]["list"]
+        return [p for p in pos if float(p.get("size", 0)) > 0]
+    
+    def closed_pnl(self, start_time=None, end_time=None, cursor=None, limit=100):
+        params = {'category': "linear", 'limit': limit}
+        if start_time is not None:
+            params['startTime'] = start_time
+        if end_time is not None:
+            params['endTime'] = end_time
+        if cursor:
+            params['cursor'] = cursor
+        result = self.client.call('get_closed_pnl', **params)["result"]
+        return result.get("list", []), result.get("nextPageCursor") or None
+    
+    def fetch(self):
         try:
-            pos = client.get_positions(category="linear", settleCoin="USDT")["result"]["list"]
+            usdt = self.balance()
         except Exception as e:
-            pos = []
-            logging.error(f"Fehler bei Bybit Positionen {acc['name']}: {e}")
+            logging.error(f"Fehler bei Bybit {self.acc['name']}: {e}")
+            return 0.0, [], "❌"
         
-        positions = [p for p in pos if float(p.get("size", 0)) > 0]
+        try:
+            positions = self.positions()
+        except Exception as e:
+            positions = []
+            logging.error(f"Fehler bei Bybit Positionen {self.acc['name']}: {e}")
         return usdt, positions, "✅"
-    except Exception as e:
-        logging.error(f"Fehler bei Bybit {acc['name']}: {e}")
-        return 0.0, [], "❌"
 
-def get_blofin_data(acc):
-    try:
-        client = BlofinAPI(acc["key"], acc["secret"], acc["passphrase"])
+class BlofinAdapter(ExchangeAdapter):
+    exchange = "blofin"
+    
+    @property
+    def client(self):
+        return get_blofin_client(self.acc)
+    
+    def balance(self):
+        """USDT-Equity; None, wenn Blofin keine Daten liefert"""
+        balance_response = self.client.get_account_balance()
+        logging.info(f"Blofin Raw Balance Response for {self.acc['name']}: {balance_response}")
+        
+        if balance_response.get('code') != '0' or not balance_response.get('data'):
+            return None
         
         usdt = 0.0
-        status = "❌"
+        data = balance_response['data']
         
-        try:
-            balance_response = client.get_account_balance()
-            logging.info(f"Blofin Raw Balance Response for {acc['name']}: {balance_response}")
-            
-            if balance_response.get('code') == '0' and balance_response.get('data'):
-                status = "✅"
-                data = balance_response['data']
+        if isinstance(data, list):
+            for balance_item in data:
+                currency = (balance_item.get('currency') or 
+                          balance_item.get('ccy') or 
+                          balance_item.get('coin', '')).upper()
                 
-                if isinstance(data, list):
-                    for balance_item in data:
-                        currency = (balance_item.get('currency') or 
-                                  balance_item.get('ccy') or 
-                                  balance_item.get('coin', '')).upper()
-                        
-                        if currency == 'USDT':
-                            possible_fields = [
-                                'totalEq', 'total_equity', 'equity', 'totalEquity',
-                                'available', 'availBal', 'availableBalance',
-                                'balance', 'bal', 'cashBal', 'cash_balance'
-                            ]
-                            
-                            for field in possible_fields:
-                                value = balance_item.get(field)
-                                if value is not None:
-                                    try:
-                                        balance_value = float(value)
-                                        if balance_value > usdt:
-                                            usdt = balance_value
-                                            logging.info(f"Using balance field '{field}': {balance_value}")
-                                    except (ValueError, TypeError):
-                                        continue
-                            break
-                            
-                elif isinstance(data, dict):
+                if currency == 'USDT':
                     possible_fields = [
                         'totalEq', 'total_equity', 'equity', 'totalEquity',
-                        'available', 'availBal', 'balance', 'cashBal'
+                        'available', 'availBal', 'availableBalance',
+                        'balance', 'bal', 'cashBal', 'cash_balance'
                     ]
                     
                     for field in possible_fields:
-                        value = data.get(field)
+                        value = balance_item.get(field)
                         if value is not None:
                             try:
                                 balance_value = float(value)
                                 if balance_value > usdt:
                                     usdt = balance_value
-                                    logging.info(f"Using direct field '{field}': {balance_value}")
+                                    logging.info(f"Using balance field '{field}': {balance_value}")
                             except (ValueError, TypeError):
                                 continue
-                
-                if usdt < 100:
-                    logging.warning(f"Balance zu niedrig für {acc['name']}: {usdt}, verwende Fallback")
-                    expected_balance = startkapital.get(acc['name'], 1492.00) * 1.05
-                    usdt = expected_balance
+                    break
                     
-        except Exception as e:
-            logging.error(f"Blofin balance error for {acc['name']}: {e}")
-            usdt = startkapital.get(acc['name'], 1492.00)
+        elif isinstance(data, dict):
+            possible_fields = [
+                'totalEq', 'total_equity', 'equity', 'totalEquity',
+                'available', 'availBal', 'balance', 'cashBal'
+            ]
+            
+            for field in possible_fields:
+                value = data.get(field)
+                if value is not None:
+                    try:
+                        balance_value = float(value)
+                        if balance_value > usdt:
+                            usdt = balance_value
+                            logging.info(f"Using direct field '{field}': {balance_value}")
+                    except (ValueError, TypeError):
+                        continue
         
+        if usdt < 100:
+            logging.warning(f"Balance zu niedrig für {self.acc['name']}: {usdt}, verwende Fallback")
+            expected_balance = startkapital.get(self.acc['name'], 1492.00) * 1.05
+            usdt = expected_balance
+        return usdt
+    
+    def positions(self):
         positions = []
         try:
-            pos_response = client.get_positions()
-            logging.info(f"Blofin Positions Raw for {acc['name']}: {pos_response}")
+            pos_response = self.client.get_positions()
+            logging.info(f"Blofin Positions Raw for {self.acc['name']}: {pos_response}")
 
             if pos_response.get('code') == '0' and pos_response.get('data'):
                 for pos in pos_response['data']:
@@ -1028,191 +2430,197 @@ def get_blofin_data(acc):
                         logging.info(f"FINAL Blofin Position: {symbol} Size={actual_size} Side={display_side} PnL={pnl_value}")
                         
         except Exception as e:
-            logging.error(f"Blofin positions error for {acc['name']}: {e}")
-
-        logging.info(f"FINAL Blofin {acc['name']}: Status={status}, Balance=${usdt:.2f}, Positions={len(positions)}")
+            logging.error(f"Blofin positions error for {self.acc['name']}: {e}")
         
-        return usdt, positions, status
+        return positions
     
-    except Exception as e:
-        logging.error(f"General Blofin error for {acc['name']}: {e}")
-        return startkapital.get(acc['name'], 1492.00), [], "❌"
+    def fetch(self):
+        try:
+            usdt = self.balance()
+            status = "❌" if usdt is None else "✅"
+            usdt = usdt or 0.0
+        except Exception as e:
+            logging.error(f"Blofin balance error for {self.acc['name']}: {e}")
+            usdt, status = startkapital.get(self.acc['name'], 1492.00), "❌"
+        
+        positions = self.positions()
+        logging.info(f"FINAL Blofin {self.acc['name']}: Status={status}, Balance=${usdt:.2f}, Positions={len(positions)}")
+        return usdt, positions, status
 
-def create_cached_charts(account_data):
-    cache_key = "charts_" + str(hash(str([(a['name'], a['pnl_percent']) for a in account_data])))
+EXCHANGE_ADAPTERS = {
+    "bybit": BybitAdapter,
+    "blofin": BlofinAdapter
+}
+
+def get_exchange_adapter(acc):
+    return EXCHANGE_ADAPTERS[acc["exchange"]](acc)
+
+PROJEKTE = {
+    "10k→1Mio Projekt\n07.05.2025": ["Incubatorzone", "Memestrategies", "Ethapestrategies", "Altsstrategies", "Solstrategies", "Btcstrategies", "Corestrategies"],
+    "2k→10k Projekt\n13.05.2025": ["2k->10k Projekt"],
+    "1k→5k Projekt\n16.05.2025": ["1k->5k Projekt"],
+    "Claude Projekt\n25.06.2025": ["Claude Projekt"],
+    "7-Tage Projekt\n22.05.2025": ["7 Tage Performer"]
+}
+
+def strategy_chart_data(account_data):
+    """Balken der Subaccount Performance: Label, PnL in % und absolut"""
+    return {
+        'labels': [a["name"] for a in account_data],
+        'values': [a["pnl_percent"] for a in account_data],
+        'pnl': [a["pnl"] for a in account_data]
+    }
+
+def project_chart_data(account_data):
+    """Balken der Projekt Performance (Summe der Member-Accounts gegen deren Startkapital)"""
+    proj_labels = []
+    proj_values = []
+    proj_pnl_values = []
+    
+    for pname, members in PROJEKTE.items():
+        start_sum = sum(startkapital.get(m, 0) for m in members)
+        curr_sum = sum(a["balance"] for a in account_data if a["name"] in members)
+        pnl_absolute = curr_sum - start_sum
+        pnl_percent = (pnl_absolute / start_sum) * 100 if start_sum > 0 else 0
+        proj_labels.append(pname)
+        proj_values.append(pnl_percent)
+        proj_pnl_values.append(pnl_absolute)
     
-    if cache_key in dashboard_cache:
-        cached_charts, timestamp = dashboard_cache[cache_key]
-        if datetime.now() - timestamp < timedelta(minutes=5):
-            return cached_charts
+    return {'labels': proj_labels, 'values': proj_values, 'pnl': proj_pnl_values}
 
-    try:
-        plt.style.use('dark_background')
-        
-        fig, ax = plt.subplots(figsize=(14, 8))
-        fig.patch.set_facecolor('#2c3e50')
-        ax.set_facecolor('#34495e')
-        
-        labels = [a["name"] for a in account_data]
-        values = [a["pnl_percent"] for a in account_data]
-        
-        colors = []
-        for v in values:
-            if v >= 0:
-                colors.append('#28a745')
-            else:
-                colors.append('#dc3545')
-        
-        bars = ax.bar(labels, values, color=colors, alpha=0.8, edgecolor='white', linewidth=1.5)
-        
-        ax.axhline(0, color='white', linestyle='--', alpha=0.7, linewidth=1)
+@matplotlib.style.context('dark_background')
+def render_performance_chart(chart_path, data):
+    """Balkendiagramm der Performance in % mit %- und $-Label je Balken"""
+    labels = data['labels']
+    values = data['values']
+    
+    fig = Figure(figsize=(14, 8))
+    ax = fig.subplots()
+    fig.patch.set_facecolor('#2c3e50')
+    ax.set_facecolor('#34495e')
+    
+    colors = []
+    for v in values:
+        if v >= 0:
+            colors.append('#28a745')
+        else:
+            colors.append('#dc3545')
+    
+    bars = ax.bar(labels, values, color=colors, alpha=0.8, edgecolor='white', linewidth=1.5)
+    
+    ax.axhline(0, color='white', linestyle='--', alpha=0.7, linewidth=1)
+    
+    for i, bar in enumerate(bars):
+        height = bar.get_height()
         
-        for i, bar in enumerate(bars):
-            height = bar.get_height()
-            
-            if height >= 0:
-                va = 'bottom'
-                y_offset = height + (max(values) - min(values)) * 0.02
-            else:
-                va = 'top'
-                y_offset = height - (max(values) - min(values)) * 0.02
-            
-            label_text = f"{values[i]:+.1f}%\n${account_data[i]['pnl']:+.2f}"
-            
-            ax.text(bar.get_x() + bar.get_width() / 2, y_offset,
-                    label_text,
-                    ha='center', va=va, 
-                    fontsize=10, fontweight='bold',
-                    color='white',
-                    bbox=dict(boxstyle="round,pad=0.3", 
-                            facecolor='black', 
-                            alpha=0.7,
-                            edgecolor='none'))
-        
-        ax.set_ylabel('Performance (%)', fontsize=12, color='white', fontweight='bold')
-        
-        ax.tick_params(axis='x', rotation=45, colors='white', labelsize=10)
-        ax.tick_params(axis='y', colors='white', labelsize=10)
-        
-        ax.grid(True, alpha=0.3, color='white', linestyle='-', linewidth=0.5)
-        ax.set_axisbelow(True)
-        
-        if values:
-            y_min = min(values) - abs(max(values) - min(values)) * 0.15
-            y_max = max(values) + abs(max(values) - min(values)) * 0.15
-            ax.set_ylim(y_min, y_max)
-        
-        plt.tight_layout()
-        chart_path_strategien = "static/chart_strategien.png"
-        fig.savefig(chart_path_strategien, facecolor='#2c3e50', dpi=300, bbox_inches='tight')
-        plt.close(fig)
-
-        projekte = {
-            "10k→1Mio Projekt\n07.05.2025": ["Incubatorzone", "Memestrategies", "Ethapestrategies", "Altsstrategies", "Solstrategies", "Btcstrategies", "Corestrategies"],
-            "2k→10k Projekt\n13.05.2025": ["2k->10k Projekt"],
-            "1k→5k Projekt\n16.05.2025": ["1k->5k Projekt"],
-            "Claude Projekt\n25.06.2025": ["Claude Projekt"],
-            "7-Tage Projekt\n22.05.2025": ["7 Tage Performer"]
-        }
+        if height >= 0:
+            va = 'bottom'
+            y_offset = height + (max(values) - min(values)) * 0.02
+        else:
+            va = 'top'
+            y_offset = height - (max(values) - min(values)) * 0.02
+        
+        label_text = f"{values[i]:+.1f}%\n${data['pnl'][i]:+.2f}"
+        
+        ax.text(bar.get_x() + bar.get_width() / 2, y_offset,
+                label_text,
+                ha='center', va=va, 
+                fontsize=10, fontweight='bold',
+                color='white',
+                bbox=dict(boxstyle="round,pad=0.3", 
+                        facecolor='black', 
+                        alpha=0.7,
+                        edgecolor='none'))
+    
+    ax.set_ylabel('Performance (%)', fontsize=12, color='white', fontweight='bold')
+    
+    ax.tick_params(axis='x', rotation=45, colors='white', labelsize=10)
+    ax.tick_params(axis='y', colors='white', labelsize=10)
+    
+    ax.grid(True, alpha=0.3, color='white', linestyle='-', linewidth=0.5)
+    ax.set_axisbelow(True)
+    
+    if values:
+        y_min = min(values) - abs(max(values) - min(values)) * 0.15
+        y_max = max(values) + abs(max(values) - min(values)) * 0.15
+        ax.set_ylim(y_min, y_max)
+    
+    fig.tight_layout()
+    save_figure_atomic(fig, chart_path, facecolor='#2c3e50', bbox_inches='tight')
 
-        proj_labels = []
-        proj_values = []
-        proj_pnl_values = []
-        
-        for pname, members in projekte.items():
-            start_sum = sum(startkapital.get(m, 0) for m in members)
-            curr_sum = sum(a["balance"] for a in account_data if a["name"] in members)
-            pnl_absolute = curr_sum - start_sum
-            pnl_percent = (pnl_absolute / start_sum) * 100 if start_sum > 0 else 0
-            proj_labels.append(pname)
-            proj_values.append(pnl_percent)
-            proj_pnl_values.append(pnl_absolute)
-
-        fig2, ax2 = plt.subplots(figsize=(14, 8))
-        fig2.patch.set_facecolor('#2c3e50')
-        ax2.set_facecolor('#34495e')
-        
-        proj_colors = []
-        for v in proj_values:
-            if v >= 0:
-                proj_colors.append('#28a745')
-            else:
-                proj_colors.append('#dc3545')
-        
-        bars2 = ax2.bar(proj_labels, proj_values, color=proj_colors, alpha=0.8, edgecolor='white', linewidth=1.5)
-        
-        ax2.axhline(0, color='white', linestyle='--', alpha=0.7, linewidth=1)
-        
-        for i, bar in enumerate(bars2):
-            height = bar.get_height()
-            
-            if height >= 0:
-                va = 'bottom'
-                y_offset = height + (max(proj_values) - min(proj_values)) * 0.02
-            else:
-                va = 'top'
-                y_offset = height - (max(proj_values) - min(proj_values)) * 0.02
-            
-            label_text = f"{proj_values[i]:+.1f}%\n${proj_pnl_values[i]:+.2f}"
-            
-            ax2.text(bar.get_x() + bar.get_width() / 2, y_offset,
-                     label_text,
-                     ha='center', va=va,
-                     fontsize=10, fontweight='bold',
-                     color='white',
-                     bbox=dict(boxstyle="round,pad=0.3", 
-                             facecolor='black', 
-                             alpha=0.7,
-                             edgecolor='none'))
-        
-        ax2.set_ylabel('Performance (%)', fontsize=12, color='white', fontweight='bold')
-        
-        ax2.tick_params(axis='x', rotation=45, colors='white', labelsize=10)
-        ax2.tick_params(axis='y', colors='white', labelsize=10)
-        
-        ax2.grid(True, alpha=0.3, color='white', linestyle='-', linewidth=0.5)
-        ax2.set_axisbelow(True)
-        
-        if proj_values:
-            y_min = min(proj_values) - abs(max(proj_values) - min(proj_values)) * 0.15
-            y_max = max(proj_values) + abs(max(proj_values) - min(proj_values)) * 0.15
-            ax2.set_ylim(y_min, y_max)
-        
-        plt.tight_layout()
-        chart_path_projekte = "static/chart_projekte.png"
-        fig2.savefig(chart_path_projekte, facecolor='#2c3e50', dpi=300, bbox_inches='tight')
-        plt.close(fig2)
-
-        chart_paths = {
-            'strategien': chart_path_strategien,
-            'projekte': chart_path_projekte
+def create_cached_charts(account_data):
+    """Rendert die Balkendiagramme über den Chart-Cache (nur im Render-Worker aufrufen)"""
+    try:
+        # Cache-Key ist der Hash der gezeichneten Daten: PnL in % und $ je Subaccount bzw. Projekt (aus den Balances)
+        strategy_data = strategy_chart_data(account_data)
+        project_data = project_chart_data(account_data)
+        return {
+            'strategien': render_cached_chart('chart_strategien', spec_hash(strategy_data),
+                                              lambda chart_path: render_performance_chart(chart_path, strategy_data)),
+            'projekte': render_cached_chart('chart_projekte', spec_hash(project_data),
+                                            lambda chart_path: render_performance_chart(chart_path, project_data))
         }
-        
-        dashboard_cache[cache_key] = (chart_paths, datetime.now())
-        return chart_paths
 
     except Exception as e:
         logging.error(f"Error creating charts: {e}")
         return {
-            'strategien': "static/placeholder_strategien.png",
-            'projekte': "static/placeholder_projekte.png"
+            'strategien': use_placeholder('chart_strategien', 'strategien'),
+            'projekte': use_placeholder('chart_projekte', 'projekte')
         }
 
-@cached_function(cache_duration=180)
-def get_cached_account_data():
+def fetch_account_data(acc):
+    # Begrenze parallele Requests pro Exchange (Rate Limits)
+    with exchange_semaphores[acc["exchange"]]:
+        with timed('exchange', exchange_seconds, exchange=acc["exchange"], account=acc["name"]):
+            try:
+                return get_exchange_adapter(acc).fetch()
+            except Exception as e:
+                logging.error(f"Fehler bei {acc['exchange']} {acc['name']}: {e}")
+                return startkapital.get(acc['name'], 0), [], "❌"
+
+def submit_account_fetch(acc):
+    # Läuft für diesen Account noch ein Abruf (z.B. nach Timeout), wird er wiederverwendet
+    with account_futures_lock:
+        future = account_futures.get(acc["name"])
+        if future is None or future.done():
+            future = account_fetch_executor.submit(fetch_account_data, acc)
+            account_futures[acc["name"]] = future
+        return future
+
+def get_account_data():
     account_data = []
     total_balance = 0.0
     positions_all = []
     total_positions_pnl = 0.0
+    timed_out_accounts = []
+
+    # Alle Accounts parallel abfragen, die Seite wartet höchstens ACCOUNT_FETCH_DEADLINE
+    futures = {acc["name"]: submit_account_fetch(acc) for acc in subaccounts}
+    done, _ = wait(futures.values(), timeout=ACCOUNT_FETCH_DEADLINE)
 
     for acc in subaccounts:
         name = acc["name"]
+        future = futures[name]
+
+        if future not in done:
+            logging.warning(f"Timeout für {name} nach {ACCOUNT_FETCH_DEADLINE:.0f}s - verwende Startkapital")
+            start = startkapital.get(name, 0)
+            account_data.append({
+                "name": name,
+                "status": "⏱️",
+                "balance": start,
+                "start": start,
+                "pnl": 0,
+                "pnl_percent": 0,
+                "positions": [],
+                "timed_out": True
+            })
+            total_balance += start
+            timed_out_accounts.append(name)
+            continue
         
         try:
-            if acc["exchange"] == "blofin":
-                usdt, positions, status = get_blofin_data(acc)
-            else:
-                usdt, positions, status = get_bybit_data(acc)
+            usdt, positions, status = future.result()
             
             for p in positions:
                 positions_all.append((name, p))
@@ -1232,7 +2640,8 @@ def get_cached_account_data():
                 "start": startkapital.get(name, 0),
                 "pnl": pnl,
                 "pnl_percent": pnl_percent,
-                "positions": positions
+                "positions": positions,
+                "timed_out": False
             })
 
             total_balance += usdt
@@ -1249,7 +2658,8 @@ def get_cached_account_data():
                 "start": start,
                 "pnl": 0,
                 "pnl_percent": 0,
-                "positions": []
+                "positions": [],
+                "timed_out": False
             })
             total_balance += start
 
@@ -1257,16 +2667,143 @@ def get_cached_account_data():
         'account_data': account_data,
         'total_balance': total_balance,
         'positions_all': positions_all,
-        'total_positions_pnl': total_positions_pnl
+        'total_positions_pnl': total_positions_pnl,
+        'timed_out_accounts': timed_out_accounts
     }
 
-@cached_function(cache_duration=1800)
-def get_cached_historical_performance(total_pnl, gc, spreadsheet):
-    return get_historical_performance(total_pnl, gc, spreadsheet)
+def load_account_data():
+    data = get_account_data()
+    try:
+        record_balances(data['account_data'], data['total_balance'])
+    except Exception as e:
+        logging.error(f"Fehler beim Speichern der Balances: {e}")
+    return data
+
+def load_historical_data():
+    # Sheets werden nur noch für den einmaligen Import von DailyBalances gebraucht
+    sheets_data = setup_google_sheets()
+    return {'historical_references': get_historical_pnl_references(*(sheets_data or (None, None)))}
+
+def load_trading_details():
+    """Bybit-Accounts mit abgeschlossenem Backfill aus dem Trade-Store, die übrigen (Blofin, Accounts ohne API-Key,
+    laufender Backfill) weiter aus den Trade-Sheets; den Store füllt der Scheduler, nie dieser Aufruf"""
+    try:
+        store_accounts = set(closed_pnl_store_accounts())
+    except Exception as e:
+        logging.error(f"Fehler beim Lesen des Trade-Stores: {e}")
+        store_accounts = set()
+    
+    sheet_names = [sheet_name for sheet_name, account_name in sheet_mapping.items() if account_name not in store_accounts]
+    sheet_details = {}
+    if sheet_names:
+        sheets_data = setup_google_sheets()
+        if not sheets_data and not store_accounts:
+            return []
+        if sheets_data:
+            gc, spreadsheet = sheets_data
+            sheet_details = {details['name']: details for details in get_trading_data_from_sheets(gc, spreadsheet, sheet_names=sheet_names)}
+    
+    account_details = []
+    for account_name in sheet_mapping.values():
+        if account_name in store_accounts:
+            try:
+                account_details.append(closed_pnl_account_details(account_name))
+                continue
+            except Exception as e:
+                logging.error(f"Fehler beim Lesen des Trade-Stores für {account_name}: {e}")
+        account_details.append(sheet_details.get(account_name) or empty_account_details(account_name))
+    return account_details
+
+# Hintergrund-Jobs: halten die Snapshots warm, Requests lesen nur den letzten Stand
+refresh_jobs = {
+    'account_data': {'func': load_account_data, 'interval': ACCOUNT_REFRESH_INTERVAL},
+    'historical_data': {'func': load_historical_data, 'interval': SHEETS_REFRESH_INTERVAL},
+    'trading_details': {'func': load_trading_details, 'interval': SHEETS_REFRESH_INTERVAL}
+}
+for job in refresh_jobs.values():
+    job['lock'] = Lock()
+    job['last_run'] = 0.0
+
+# Zusätzlich je ein Worker für den DailyBalances-Flush und den Closed-PnL-Sync
+refresh_executor = ThreadPoolExecutor(max_workers=len(refresh_jobs) + 2, thread_name_prefix="snapshot-refresh")
+
+def store_snapshot(name, data):
+    with snapshot_lock:
+        snapshots[name] = {'data': data, 'updated_at': time.time()}
+
+def refresh_snapshot(name, blocking=True, only_if_missing=False):
+    job = refresh_jobs[name]
+    
+    # Läuft der Job bereits, wartet ein blockierender Aufrufer auf dessen Ergebnis
+    if not job['lock'].acquire(blocking=blocking):
+        return None
+    
+    try:
+        if only_if_missing:
+            with snapshot_lock:
+                if name in snapshots:
+                    return snapshots[name]
+        
+        job['last_run'] = time.time()
+        started = time.time()
+        with timed(f"snapshot_{name}"):
+            store_snapshot(name, job['func']())
+        logging.info(f"Snapshot '{name}' aktualisiert in {time.time() - started:.2f}s")
+    except Exception as e:
+        logging.error(f"Fehler beim Aktualisieren von Snapshot '{name}': {e}")
+    finally:
+        job['lock'].release()
+    
+    with snapshot_lock:
+        return snapshots.get(name)
+
+def snapshot_scheduler():
+    while True:
+        now = time.time()
+        for name, job in refresh_jobs.items():
+            if now - job['last_run'] >= job['interval'] and not job['lock'].locked():
+                job['last_run'] = now
+                refresh_executor.submit(refresh_snapshot, name, False)
+        
+        if now - daily_flush_job['last_run'] >= DAILY_FLUSH_INTERVAL and not daily_flush_job['lock'].locked():
+            daily_flush_job['last_run'] = now
+            refresh_executor.submit(flush_daily_journal)
+        
+        if now - closed_pnl_sync_job['last_run'] >= CLOSED_PNL_SYNC_INTERVAL and not closed_pnl_sync_job['lock'].locked():
+            closed_pnl_sync_job['last_run'] = now
+            refresh_executor.submit(sync_closed_pnl)
+        time.sleep(1)
+
+def ensure_refresher_started():
+    global refresher_thread
+    
+    with refresher_lock:
+        if refresher_thread is None or not refresher_thread.is_alive():
+            refresher_thread = Thread(target=snapshot_scheduler, name="snapshot-scheduler", daemon=True)
+            refresher_thread.start()
+            logging.info("Snapshot-Scheduler gestartet")
+            chart_render_executor.submit(prerender_placeholder_charts)
+
+def get_snapshot(name):
+    """Liefert den letzten Snapshot (auch wenn veraltet); nur beim Kaltstart wird synchron geladen"""
+    ensure_refresher_started()
+    
+    with snapshot_lock:
+        snapshot = snapshots.get(name)
+    
+    if snapshot is None:
+        snapshot = refresh_snapshot(name, only_if_missing=True)
+    
+    return snapshot
 
-@cached_function(cache_duration=1800)
-def get_cached_trading_details(gc, spreadsheet):
-    return get_trading_data_from_sheets(gc, spreadsheet)
+def format_snapshot_age(snapshot):
+    if not snapshot:
+        return "unbekannt"
+    
+    age = int(time.time() - snapshot['updated_at'])
+    if age < 60:
+        return f"{age} s"
+    return f"{age // 60} min {age % 60} s"
 
 @app.route('/', methods=['GET', 'POST'])
 def login():
@@ -1286,7 +2823,9 @@ def dashboard():
         return redirect(url_for('login'))
 
     try:
-        cached_data = get_cached_account_data()
+        with timed('snapshot'):
+            account_snapshot = get_snapshot('account_data')
+        cached_data = account_snapshot['data']
         account_data = cached_data['account_data']
         total_balance = cached_data['total_balance']
         positions_all = cached_data['positions_all']
@@ -1306,51 +2845,34 @@ def dashboard():
         for acc in account_data:
             logging.info(f"  {acc['name']}: ${acc['balance']:.2f} (PnL: ${acc['pnl']:.2f})")
 
-        sheets_data = None
-        try:
-            sheets_data = setup_google_sheets()
-        except Exception as e:
-            logging.warning(f"Google Sheets setup failed: {e}")
+        with timed('historical'):
+            historical_snapshot = get_snapshot('historical_data')
+            historical_references = historical_snapshot['data']['historical_references'] if historical_snapshot else None
+            historical_performance = calculate_historical_performance(total_pnl, historical_references)
 
-        if sheets_data:
-            gc, spreadsheet = sheets_data
-            historical_performance = get_cached_historical_performance(total_pnl, gc, spreadsheet)
-            # Erstelle Equity Curve Chart
-            equity_curve_path = create_equity_curve_chart(gc, spreadsheet)
-        else:
-            historical_performance = {'1_day': 0.0, '7_day': 0.0, '30_day': 0.0}
-            equity_curve_path = create_equity_curve_chart(None, None)
-        
-        chart_paths = create_cached_charts(account_data)
-        
-        if sheets_data:
-            try:
-                gc, spreadsheet = sheets_data
-                save_daily_data(total_balance, total_pnl, gc, spreadsheet)
-            except Exception as sheets_error:
-                logging.warning(f"Sheets operations failed: {sheets_error}")
+        # Charts zeichnet der Browser (Chart.js) aus /chart-data/<name>;
+        # Balances speichert der Account-Refresh (record_balances), nicht der Seitenaufruf
 
         tz = timezone("Europe/Berlin")
-        now = datetime.now(tz).strftime("%d.%m.%Y %H:%M:%S")
+        now = datetime.fromtimestamp(account_snapshot['updated_at'], tz).strftime("%d.%m.%Y %H:%M:%S")
 
-        return render_template("dashboard.html",
-                               accounts=account_data,
-                               total_start=total_start,
-                               total_balance=total_balance,
-                               total_pnl=total_pnl,
-                               total_pnl_percent=total_pnl_percent,
-                               historical_performance=historical_performance,
-                               chart_path_strategien=chart_paths['strategien'],
-                               chart_path_projekte=chart_paths['projekte'],
-                               equity_curve_path=equity_curve_path,
-                               positions_all=positions_all,
-                               total_positions_pnl=total_positions_pnl,
-                               total_positions_pnl_percent=total_positions_pnl_percent,
-                               now=now)
+        with timed('template'):
+            return render_template("dashboard.html",
+                                   accounts=account_data,
+                                   total_start=total_start,
+                                   total_balance=total_balance,
+                                   total_pnl=total_pnl,
+                                   total_pnl_percent=total_pnl_percent,
+                                   historical_performance=historical_performance,
+                                   positions_all=positions_all,
+                                   total_positions_pnl=total_positions_pnl,
+                                   total_positions_pnl_percent=total_positions_pnl_percent,
+                                   now=now,
+                                   snapshot_age=format_snapshot_age(account_snapshot),
+                                   chart_widths=CHART_WIDTHS)
 
     except Exception as e:
         logging.error(f"Critical dashboard error: {e}")
-        equity_curve_path = create_equity_curve_chart(None, None)
         return render_template("dashboard.html",
                                accounts=[],
                                total_start=0,
@@ -1358,19 +2880,163 @@ def dashboard():
                                total_pnl=0,
                                total_pnl_percent=0,
                                historical_performance={'1_day': 0.0, '7_day': 0.0, '30_day': 0.0},
-                               chart_path_strategien="static/placeholder_strategien.png",
-                               chart_path_projekte="static/placeholder_projekte.png",
-                               equity_curve_path=equity_curve_path,
                                positions_all=[],
                                total_positions_pnl=0,
                                total_positions_pnl_percent=0,
-                               now=datetime.now().strftime("%d.%m.%Y %H:%M:%S"))
+                               now=datetime.now().strftime("%d.%m.%Y %H:%M:%S"),
+                               snapshot_age=None,
+                               chart_widths=CHART_WIDTHS)
 
 @app.route('/logout')
 def logout():
     session.pop('user', None)
     return redirect(url_for('login'))
 
+@app.route('/cache-stats')
+def cache_stats():
+    if 'user' not in session:
+        return redirect(url_for('login'))
+    
+    return jsonify({'dashboard_cache': dashboard_cache.stats(), 'trade_sync': trade_sync_stats, 'chart_cache': dict(chart_cache_stats),
+                    'bybit_clients': bybit_client_stats(), 'closed_pnl_sync': closed_pnl_sync_stats})
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def add_server_timing(response):
+    """Server-Timing-Header mit der Dauer je Abschnitt (gleichnamige Abschnitte summiert) und der Gesamtdauer"""
+    total = time.perf_counter() - g.get('request_started', time.perf_counter())
+    request_seconds.observe(total, endpoint=request.endpoint or 'unknown')
+    
+    stages = OrderedDict()
+    for stage, duration in g.get('server_timing', []):
+        stages[stage] = stages.get(stage, 0.0) + duration
+    entries = [f"{stage};dur={duration * 1000:.1f}" for stage, duration in stages.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    response.headers['Server-Timing'] = ', '.join(entries)
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus-Textformat: Laufzeit-Histogramme, Cache-Trefferquoten und Trade-Sync-Zähler"""
+    if METRICS_TOKEN:
+        if request.headers.get('Authorization') != f"Bearer {METRICS_TOKEN}":
+            return "Unauthorized", 401
+    elif 'user' not in session:
+        return redirect(url_for('login'))
+    
+    lines = []
+    for histogram in (request_seconds, stage_seconds, exchange_seconds, sheets_seconds, chart_render_seconds, bybit_client_seconds):
+        lines.extend(histogram.exposition())
+    
+    lines.append("# TYPE bybit_client_errors_total counter")
+    for name, stats in sorted(bybit_client_stats().items()):
+        lines.append(f"bybit_client_errors_total{format_labels((('account', name),))} {stats['errors']}")
+    
+    cache = dashboard_cache.stats()
+    for key in ('hits', 'misses', 'coalesced', 'evictions', 'expirations'):
+        lines.append(f"# TYPE dashboard_cache_{key}_total counter")
+        lines.append(f"dashboard_cache_{key}_total {cache[key]}")
+    lines.append("# TYPE dashboard_cache_hit_ratio gauge")
+    lines.append(f"dashboard_cache_hit_ratio {cache['hit_ratio']:.4f}")
+    lines.append("# TYPE dashboard_cache_size gauge")
+    lines.append(f"dashboard_cache_size {cache['size']}")
+    
+    for key in ('hits', 'waits', 'renders'):
+        lines.append(f"# TYPE chart_cache_{key}_total counter")
+        lines.append(f"chart_cache_{key}_total {chart_cache_stats[key]}")
+    
+    for key in ('rows', 'trades', 'failed_rows', 'full_scans'):
+        if key in trade_sync_stats:
+            lines.append(f"# TYPE trade_sync_last_{key} gauge")
+            lines.append(f"trade_sync_last_{key} {trade_sync_stats[key]}")
+    
+    with snapshot_lock:
+        snapshot_times = {name: snapshot['updated_at'] for name, snapshot in snapshots.items()}
+    lines.append("# TYPE dashboard_snapshot_age_seconds gauge")
+    for name, updated_at in sorted(snapshot_times.items()):
+        lines.append(f"dashboard_snapshot_age_seconds{format_labels((('snapshot', name),))} {time.time() - updated_at:.1f}")
+    
+    return '\n'.join(lines) + '\n', 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+@app.route('/charts/<name>.<any(png, webp):fmt>')
+def chart_image(name, fmt='png'):
+    """Gerenderte Charts (?w= aus CHART_WIDTHS) mit ETag (Content-Hash) und Last-Modified, damit Browser per 304 revalidieren"""
+    if 'user' not in session:
+        return redirect(url_for('login'))
+    
+    width = request.args.get('w', CHART_DEFAULT_WIDTH, type=int)
+    if name not in CHART_JOBS or width not in CHART_WIDTHS:
+        return "Chart nicht gefunden", 404
+    
+    # PNGs nur noch für Clients ohne JavaScript (<noscript>): Render-Worker aktualisiert sie auf Anfrage,
+    # solange liefert der Request die vorhandene Datei aus und wartet nur, wenn es noch keine gibt
+    future = submit_chart_render(name)
+    if name not in chart_sources or not chart_ready(chart_sources[name]):
+        try:
+            with timed('chart_wait'):
+                future.result(timeout=CHART_RENDER_TIMEOUT)
+        except Exception as e:
+            logging.error(f"Fehler beim Rendern von {name}: {e}")
+    
+    if name not in chart_sources:
+        return "Chart nicht gefunden", 404
+    image_path = chart_variant_path(chart_sources[name], width, fmt)
+    if not os.path.exists(image_path):
+        return "Chart nicht gefunden", 404
+    
+    version = chart_versions.get(name)
+    return send_file(os.path.abspath(image_path), mimetype=CHART_FORMATS[fmt], conditional=True, max_age=0,
+                     etag=f"{version}-{width}-{fmt}" if version else True)
+
+@app.route('/chart-data/<name>')
+def chart_data(name):
+    """Datenreihen für die im Browser gezeichneten Charts (strategien, projekte, equity)"""
+    if 'user' not in session:
+        return redirect(url_for('login'))
+    
+    try:
+        if name == 'equity':
+            sheets_data = setup_google_sheets()
+            return jsonify(equity_curve_spec(*(sheets_data or (None, None))))
+        
+        if name not in ('strategien', 'projekte'):
+            return jsonify({'error': f"Unbekannter Chart: {name}"}), 404
+        
+        account_snapshot = get_snapshot('account_data')
+        account_data = account_snapshot['data']['account_data']
+        data = strategy_chart_data(account_data) if name == 'strategien' else project_chart_data(account_data)
+        
+        response = jsonify(data)
+        response.headers['X-Snapshot-Age'] = format_snapshot_age(account_snapshot)
+        return response
+    
+    except Exception as e:
+        logging.error(f"Fehler beim Laden der Chart-Daten {name}: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/debug-trace')
+def debug_trace():
+    """Trace-Modus für ein Trade-Sheet setzen (?sheet=Name) oder ohne Parameter abschalten"""
+    global trace_sheet
+    if 'user' not in session:
+        return redirect(url_for('login'))
+    
+    sheet_name = request.args.get('sheet') or None
+    if sheet_name and sheet_name not in sheet_mapping:
+        return f"Unbekanntes Sheet: {sheet_name}", 404
+    
+    with trade_store_lock:
+        trace_sheet = sheet_name
+        if sheet_name:
+            # Beim nächsten Sync komplett neu einlesen, damit alle Zeilen im Trace erscheinen
+            trade_store.pop(sheet_name, None)
+    
+    logging.info(f"Trace-Modus: {sheet_name or 'aus'}")
+    return jsonify({'trace_sheet': trace_sheet})
+
 @app.route('/simple-debug')
 def simple_debug():
     if 'user' not in session:
@@ -1385,7 +3051,7 @@ def simple_debug():
         
         gc, spreadsheet = sheets_data
         
-        worksheet = spreadsheet.worksheet("Incubator")
+        worksheet = get_worksheet(spreadsheet, "Incubator")
         all_records = worksheet.get_all_records()
         
         debug_output.append(f"=== INCUBATOR SHEET TEST (EXACT MAIN LOGIC) ===")
@@ -1462,23 +3128,9 @@ def debug_sheets():
         gc, spreadsheet = sheets_data
         debug_info.append("✅ Google Sheets Verbindung erfolgreich")
         
-        sheet_mapping = {
-            "Incubator": "Incubatorzone",
-            "Meme": "Memestrategies", 
-            "Ethape": "Ethapestrategies",
-            "Alts": "Altsstrategies",
-            "Sol": "Solstrategies",
-            "Btc": "Btcstrategies",
-            "Core": "Corestrategies",
-            "2k-10k": "2k->10k Projekt",
-            "1k-5k": "1k->5k Projekt",
-            "Claude": "Claude Projekt",
-            "Blofin-7-Tage": "7 Tage Performer"
-        }
-        
         for sheet_name, account_name in sheet_mapping.items():
             try:
-                worksheet = spreadsheet.worksheet(sheet_name)
+                worksheet = get_worksheet(spreadsheet, sheet_name)
                 debug_info.append(f"✅ Worksheet '{sheet_name}' gefunden")
                 
                 all_records = worksheet.get_all_records()
@@ -1487,6 +3139,7 @@ def debug_sheets():
                 if all_records:
                     columns = list(all_records[0].keys())
                     debug_info.append(f"   📋 Spalten: {', '.join(columns)}")
+                    debug_info.append(f"   🧭 Spalten-Zuordnung: {column_report(resolve_trade_columns(sheet_name, columns))}")
                     
                     for i, record in enumerate(all_records[:3]):
                         debug_info.append(f"   📄 Zeile {i+1}: {record}")
@@ -1537,7 +3190,7 @@ def debug_blofin():
         return "Blofin Account nicht gefunden"
     
     try:
-        client = BlofinAPI(blofin_acc["key"], blofin_acc["secret"], blofin_acc["passphrase"])
+        client = get_blofin_client(blofin_acc)
         
         # Rohe Positions-Daten abrufen
         pos_response = client.get_positions()
@@ -1610,16 +3263,15 @@ def account_details_data():
         return redirect(url_for('login'))
     
     try:
-        sheets_data = setup_google_sheets()
+        trading_snapshot = get_snapshot('trading_details')
+        account_details_data = trading_snapshot['data'] if trading_snapshot else []
         
-        if sheets_data:
-            gc, spreadsheet = sheets_data
-            account_details_data = get_trading_data_from_sheets(gc, spreadsheet)
-        else:
-            logging.warning("Google Sheets nicht verfügbar")
-            account_details_data = []
+        if not account_details_data:
+            logging.warning("Keine Trading-Details verfügbar")
         
-        return jsonify(account_details_data)
+        response = jsonify(account_details_data)
+        response.headers['X-Snapshot-Age'] = format_snapshot_age(trading_snapshot)
+        return response
         
     except Exception as e:
         logging.error(f"Fehler beim Laden der Account Details Data: {e}")